@@ -181,7 +181,7 @@ def run_demo(eip_number: int = 1559, client: str = "go-ethereum"):
     # Validate EIP support
     spec_fetcher = SpecFetcher(github_token=config.github_token)
     code_fetcher = CodeFetcher(github_token=config.github_token)
-    parser = CodeParser()
+    parser = CodeParser(use_tree_sitter=False)
 
     if eip_number not in spec_fetcher.supported_eips():
         print(f"   EIP-{eip_number} is not in the registry. "
@@ -2,12 +2,37 @@
 
 import json
 import re
+import sys
 from abc import ABC, abstractmethod
 from dataclasses import dataclass
 from typing import Any, Dict, List, Optional
 
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
 
-@dataclass
+
+def _json_loads(text: str) -> Any:
+    """Decode JSON with orjson when installed, stdlib json otherwise.
+
+    orjson rejects some input stdlib json accepts (NaN/Infinity literals,
+    integers beyond 64 bits), so its failures are retried with json.loads;
+    the same replies parse, or raise json.JSONDecodeError, either way.
+    """
+    if ORJSON_AVAILABLE:
+        try:
+            return orjson.loads(text)
+        except orjson.JSONDecodeError:
+            pass
+    return json.loads(text)
+
+
+_SLOTS = {"slots": True} if sys.version_info >= (3, 10) else {}
+
+
+@dataclass(**_SLOTS)
 class AnalysisResult:
     """Result of a compliance analysis"""
     status: str  # FULL_MATCH, PARTIAL_MATCH, MISSING, UNCERTAIN, ERROR
@@ -126,7 +151,7 @@ Important: If the code correctly implements the spec, return status "FULL_MATCH"
         text = text.strip()
 
         try:
-            return json.loads(text)
+            return _json_loads(text)
         except json.JSONDecodeError:
             pass
 
@@ -134,7 +159,7 @@ Important: If the code correctly implements the spec, return status "FULL_MATCH"
         json_match = re.search(r'\{[\s\S]*\}', text)
         if json_match:
             try:
-                return json.loads(json_match.group())
+                return _json_loads(json_match.group())
             except json.JSONDecodeError:
                 pass
 
@@ -157,7 +182,7 @@ Important: If the code correctly implements the spec, return status "FULL_MATCH"
                 '"}, "summary": "Analysis truncated"}',
             ]:
                 try:
-                    return json.loads(fragment + suffix)
+                    return _json_loads(fragment + suffix)
                 except json.JSONDecodeError:
                     continue
 
@@ -166,7 +191,7 @@ Important: If the code correctly implements the spec, return status "FULL_MATCH"
             for end in range(len(fragment) - 1, 0, -1):
                 if fragment[end] == '}':
                     try:
-                        return json.loads(fragment[:end + 1])
+                        return _json_loads(fragment[:end + 1])
                     except json.JSONDecodeError:
                         continue
 
@@ -213,14 +238,16 @@ class GeminiAnalyzer(BaseAnalyzer):
                 ),
             )
 
-            result = self._parse_json_response(response.text)
+            # .text re-joins the candidate's parts on every access
+            text = response.text
+            result = self._parse_json_response(text)
 
             return AnalysisResult(
                 status=result.get("status", "UNCERTAIN"),
                 confidence=result.get("confidence", 0),
                 issues=result.get("issues", []),
                 summary=result.get("summary", ""),
-                raw_response=response.text
+                raw_response=text
             )
 
         except Exception as e:
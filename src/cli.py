@@ -1,7 +1,9 @@
 """Command-line interface for PRSpec."""
 
+from collections import defaultdict
 from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime
+from functools import lru_cache
 from typing import Optional
 
 import click
@@ -42,6 +44,20 @@ def cli():
     pass
 
 
+# ---- Helper: shared fetchers ----
+
+@lru_cache(maxsize=4)
+def _spec_fetcher(github_token: Optional[str] = None) -> SpecFetcher:
+    """Return a per-token SpecFetcher so its HTTP session is reused."""
+    return SpecFetcher(github_token=github_token)
+
+
+@lru_cache(maxsize=4)
+def _code_fetcher(github_token: Optional[str] = None) -> CodeFetcher:
+    """Return a per-token CodeFetcher so its HTTP session is reused."""
+    return CodeFetcher(github_token=github_token)
+
+
 def _analyze_one_file(analyzer, spec_text, file_path, code_content, context):
     """Analyze a single file — designed to run inside a thread pool."""
     result = analyzer.analyze_compliance(spec_text, code_content, context)
@@ -56,15 +72,17 @@ def _run_analysis(eip: int, client: str, cfg, llm_provider: str,
                   progress_callback=None):
     """Fetch spec+code, build analyzer, return (results_list, analyzer).
     Runs all file analyses in parallel via threads for speed."""
-    spec_fetcher = SpecFetcher(github_token=cfg.github_token)
-    code_fetcher = CodeFetcher(github_token=cfg.github_token)
+    spec_fetcher = _spec_fetcher(cfg.github_token)
+    code_fetcher = _code_fetcher(cfg.github_token)
 
-    # --- Fetch specification (generic for any EIP) ---
-    spec_data = spec_fetcher.fetch_eip_spec(eip)
-    eip_title = spec_data.get("title", f"EIP-{eip}")
+    # --- Fetch spec and implementation code concurrently (both network-bound) ---
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        spec_future = pool.submit(spec_fetcher.fetch_eip_spec, eip)
+        code_future = pool.submit(code_fetcher.fetch_eip_implementation, client, eip)
+        spec_data = spec_future.result()
+        code_files = code_future.result()
 
-    # --- Fetch implementation code (generic for any EIP) ---
-    code_files = code_fetcher.fetch_eip_implementation(client, eip)
+    eip_title = spec_data.get("title", f"EIP-{eip}")
     language = CodeFetcher.client_language(client)
 
     # --- Build analyzer ---
@@ -77,8 +95,14 @@ def _run_analysis(eip: int, client: str, cfg, llm_provider: str,
     focus_areas = cfg.get_eip_focus_areas(eip)
     spec_text = spec_data.get("eip_markdown", "")
 
+    # Results are written into their original file slot as they complete,
+    # so no re-sort is needed afterwards.
+    index_of = {path: i for i, path in enumerate(code_files)}
+    results = [None] * len(code_files)
+
     futures = {}
-    with ThreadPoolExecutor(max_workers=min(len(code_files), 5)) as pool:
+    max_workers = max(1, min(len(code_files), cfg.max_concurrency))
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
         for file_path, code_content in code_files.items():
             context = {
                 "eip_number": eip,
@@ -94,15 +118,11 @@ def _run_analysis(eip: int, client: str, cfg, llm_provider: str,
             )
             futures[future] = file_path
 
-        results = []
         for future in as_completed(futures):
-            results.append(future.result())
+            file_path = futures[future]
+            results[index_of[file_path]] = future.result()
             if progress_callback:
-                progress_callback(futures[future])
-
-    # Keep original file order
-    file_order = list(code_files.keys())
-    results.sort(key=lambda r: file_order.index(r["file_name"]))
+                progress_callback(file_path)
 
     return results, analyzer
 
@@ -155,6 +175,7 @@ def analyze(eip: int, client: str, provider: Optional[str], output: str,
                 BarColumn(bar_width=30),
                 MofNCompleteColumn(),
                 console=console,
+                refresh_per_second=4,
             ) as progress:
                 task = progress.add_task(
                     f"Analyzing {n_files} files ({est})", total=n_files
@@ -167,7 +188,20 @@ def analyze(eip: int, client: str, provider: Optional[str], output: str,
                 )
         else:
             click.echo(f"\n  Analyzing {n_files} files ({est})...")
-            results, analyzer = _run_analysis(eip, client, cfg, llm_provider)
+            # Report roughly every 10% rather than on every file
+            report_every = max(1, n_files // 10)
+            done = 0
+
+            def on_file_done(fname):
+                nonlocal done
+                done += 1
+                if done % report_every == 0 or done == n_files:
+                    click.echo(f"  {done}/{n_files} files analyzed")
+
+            results, analyzer = _run_analysis(
+                eip, client, cfg, llm_provider,
+                progress_callback=on_file_done
+            )
 
         # Generate report
         report_gen = ReportGenerator(cfg.output_config.get("directory", "output"))
@@ -213,7 +247,7 @@ def fetch_spec(eip: int):
         prspec fetch-spec --eip 4844
     """
     try:
-        spec_fetcher = SpecFetcher()
+        spec_fetcher = _spec_fetcher()
         content = spec_fetcher.fetch_eip(eip)
 
         if RICH_AVAILABLE:
@@ -239,7 +273,7 @@ def list_files(client: str, eip: int):
         prspec list-files --client go-ethereum --eip 4844
     """
     try:
-        code_fetcher = CodeFetcher()
+        code_fetcher = _code_fetcher()
         files = code_fetcher.fetch_eip_implementation(client, eip)
 
         if RICH_AVAILABLE:
@@ -249,14 +283,14 @@ def list_files(client: str, eip: int):
             table.add_column("Lines", style="green")
 
             for path, content in files.items():
-                lines = len(content.split('\n'))
+                lines = content.count('\n') + 1
                 table.add_row(path, str(lines))
 
             console.print(table)
         else:
             click.echo(f"EIP-{eip} files in {client}:")
             for path, content in files.items():
-                click.echo(f"  - {path} ({len(content.split(chr(10)))} lines)")
+                click.echo(f"  - {path} ({content.count(chr(10)) + 1} lines)")
 
     except Exception as e:
         click.echo(f"Error: {str(e)}", err=True)
@@ -266,8 +300,8 @@ def list_files(client: str, eip: int):
 def list_eips():
     """List all supported EIPs with full file mappings."""
     try:
-        spec_fetcher = SpecFetcher()
-        code_fetcher = CodeFetcher()
+        spec_fetcher = _spec_fetcher()
+        code_fetcher = _code_fetcher()
 
         if RICH_AVAILABLE:
             from rich.table import Table
@@ -276,12 +310,15 @@ def list_eips():
             table.add_column("Title", style="white")
             table.add_column("Clients with mappings", style="green")
 
+            # Invert client -> EIPs once instead of probing every pair
+            eip_to_clients = defaultdict(list)
+            for client in code_fetcher.supported_clients():
+                for mapped_eip in code_fetcher.supported_eips_for_client(client):
+                    eip_to_clients[mapped_eip].append(client)
+
             for eip_num in spec_fetcher.supported_eips():
                 title = spec_fetcher.get_eip_title(eip_num)
-                clients_with = [
-                    c for c in code_fetcher.supported_clients()
-                    if eip_num in code_fetcher.supported_eips_for_client(c)
-                ]
+                clients_with = eip_to_clients.get(eip_num, [])
                 table.add_row(str(eip_num), title, ", ".join(clients_with) or "—")
 
             console.print(table)
@@ -299,8 +336,8 @@ def list_eips():
 def clear_cache():
     """Clear all cached specifications and code files."""
     try:
-        spec_fetcher = SpecFetcher()
-        code_fetcher = CodeFetcher()
+        spec_fetcher = _spec_fetcher()
+        code_fetcher = _code_fetcher()
 
         spec_fetcher.clear_cache()
         code_fetcher.clear_cache()
@@ -1,10 +1,28 @@
 """Fetches implementation files from Ethereum client repos (geth, Nethermind, Besu)."""
 
+import hashlib
+import itertools
+import json
+import mmap
+import os
+import shutil
+import tarfile
 import tempfile
+import threading
+import time
+import weakref
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import timezone
+from email.utils import parsedate_to_datetime
+from functools import cache, lru_cache
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from types import MappingProxyType
+from typing import Any, Dict, List, Mapping, Optional, Sequence, Tuple, Union
 
 import requests
+from requests.adapters import HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+from urllib3.util.retry import Retry
 
 try:
     from git import Repo
@@ -12,12 +30,48 @@ try:
 except ImportError:
     GIT_AVAILABLE = False
 
+try:
+    import zstandard as zstd
+    ZSTD_AVAILABLE = True
+except ImportError:
+    ZSTD_AVAILABLE = False
+
+_GRAPHQL_URL = "https://api.github.com/graphql"
+
+# Frame magic that marks a compressed cache object (source text can't start with it)
+_ZSTD_MAGIC = b"\x28\xb5\x2f\xfd"
+
+try:
+    import h2  # noqa: F401  (httpx's HTTP/2 backend)
+    import httpx
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+
+@lru_cache(maxsize=None)
+def _shared_adapter(pool_maxsize: int) -> HTTPAdapter:
+    """Keep-alive pool shared by every CodeFetcher with this pool depth.
+
+    One pool per GitHub host (raw, api, codeload); new instances reuse the
+    open TLS connections. Transient 5xx are retried; once retries run out
+    the last response is returned, so raise_for_status() still raises
+    HTTPError instead of urllib3 surfacing a RetryError.
+    """
+    return HTTPAdapter(
+        pool_connections=4,
+        pool_maxsize=pool_maxsize,
+        max_retries=Retry(total=3, backoff_factor=0.3, status_forcelist=[502, 503, 504],
+                          raise_on_status=False),
+    )
+
 
 class CodeFetcher:
     """Fetches code from Ethereum client implementations"""
 
     # Client repos and per-EIP file paths.
-    CLIENTS: Dict[str, Dict[str, Any]] = {
+    # Frozen into read-only mappings at import time (see _freeze_clients).
+    CLIENTS: Mapping[str, Mapping[str, Any]] = {
         "go-ethereum": {
             "url": "https://github.com/ethereum/go-ethereum",
             "language": "go",
@@ -88,61 +142,569 @@ class CodeFetcher:
         },
     }
 
-    def __init__(self, github_token: Optional[str] = None, cache_dir: Optional[str] = None):
-        """Set up HTTP session and local cache directory."""
-        self.github_token = github_token
+    def __init__(self, github_token: Union[str, Sequence[str], None] = None,
+                 cache_dir: Optional[str] = None, negative_ttl: int = 3600,
+                 use_http2: bool = False, cache_ttl_seconds: Optional[int] = 86400,
+                 compress: bool = True, max_workers: int = 8):
+        """Set up HTTP session and local cache directory.
+
+        *github_token* may be a list of tokens; API calls then rotate through
+        them so bulk runs spread across several rate-limit budgets.
+        *negative_ttl* is how long (seconds) a 404/410 is remembered before
+        the path is probed again; 0 disables negative caching.
+        *cache_ttl_seconds* is how long a cached file is served without
+        asking GitHub; older entries are revalidated with a conditional GET
+        (None keeps them forever).
+        *compress* stores new cache objects zstd-compressed when the
+        zstandard package is installed; reads handle either form.
+        *use_http2* multiplexes raw file downloads over one HTTP/2
+        connection via httpx (``pip install 'httpx[http2]'``).
+        *max_workers* caps how many files are downloaded side by side.
+        """
+        self.max_workers = max(1, max_workers)
+        self.negative_ttl = negative_ttl
+        self.cache_ttl_seconds = cache_ttl_seconds
+        self.compress = compress and ZSTD_AVAILABLE
+        if isinstance(github_token, str):
+            self._tokens = [github_token]
+        else:
+            self._tokens = [t for t in (github_token or []) if t]
+        self.github_token = self._tokens[0] if self._tokens else None
+        self._token_cycle = itertools.cycle(self._tokens)
+        self._token_lock = threading.Lock()
         self.cache_dir = Path(cache_dir) if cache_dir else Path.cwd() / ".code_cache"
         self.session = requests.Session()
+        # (owner, repo, branch) -> (resolved at, listing truncated, path -> blob SHA)
+        self._trees: Dict[Tuple[str, str, str], Tuple[float, bool, Dict[str, str]]] = {}
+        # Deep enough for the parallel fetch workers
+        self.session.mount("https://", _shared_adapter(max(16, self.max_workers)))
 
-        if github_token:
-            self.session.headers["Authorization"] = f"token {github_token}"
-        self.session.headers["Accept"] = "application/vnd.github.v3+json"
+        self._h2_client = None
+        if use_http2:
+            if not HTTP2_AVAILABLE:
+                raise RuntimeError("httpx[http2] not installed. Install with: pip install 'httpx[http2]'")
+            self._h2_client = httpx.Client(transport=httpx.HTTPTransport(
+                http2=True,
+                retries=3,
+                limits=httpx.Limits(max_keepalive_connections=4, max_connections=16),
+            ))
+            # Release the HTTP/2 connection when the fetcher is collected
+            weakref.finalize(self, self._h2_client.close)
+
+        # No session-wide Authorization/Accept: raw and codeload downloads of
+        # public repos go out anonymous (edge-cacheable); _api_get() adds
+        # credentials and the JSON media type only for api.github.com.
 
         self.cache_dir.mkdir(parents=True, exist_ok=True)
 
     # ---- Helpers ----
 
     @classmethod
-    def supported_clients(cls) -> List[str]:
-        """Return list of known client names."""
-        return list(cls.CLIENTS.keys())
+    @cache
+    def supported_clients(cls) -> Tuple[str, ...]:
+        """Return the known client names (computed once)."""
+        return tuple(cls.CLIENTS)
 
     @classmethod
     def client_language(cls, client: str) -> str:
         """Return the primary language for a client."""
-        info = cls.CLIENTS.get(client)
-        if not info:
-            raise ValueError(f"Unknown client: {client}")
-        return info["language"]
+        try:
+            return _CLIENT_LANGUAGES[client]
+        except KeyError:
+            raise ValueError(f"Unknown client: {client}") from None
 
     @classmethod
-    def supported_eips_for_client(cls, client: str) -> List[int]:
-        """Return the list of EIP numbers with file mappings for *client*."""
-        info = cls.CLIENTS.get(client)
-        if not info:
-            raise ValueError(f"Unknown client: {client}")
-        return sorted(info.get("eip_files", {}).keys())
+    def supported_eips_for_client(cls, client: str) -> Tuple[int, ...]:
+        """Return the EIP numbers with file mappings for *client*, sorted.
+
+        Precomputed at import — the registry is frozen, so this is a lookup.
+        """
+        try:
+            return _SUPPORTED_EIPS[client]
+        except KeyError:
+            raise ValueError(f"Unknown client: {client}") from None
 
     # ---- Core fetchers ----
 
+    def _api_get(self, url: str, **kwargs: Any) -> requests.Response:
+        """GET against api.github.com using the next token in the pool.
+
+        The token goes in per-request headers, not the shared session, so
+        parallel workers don't race on the Authorization header.
+        """
+        headers = {"Accept": "application/vnd.github.v3+json"}
+        headers.update(kwargs.pop("headers", None) or {})
+        if self._tokens:
+            with self._token_lock:
+                token = next(self._token_cycle)
+            headers["Authorization"] = f"token {token}"
+        return self.session.get(url, headers=headers, **kwargs)
+
+    def _graphql(self, query: str, variables: Dict[str, Any]) -> Dict[str, Any]:
+        """POST a GraphQL query with the next pooled token; return its data."""
+        with self._token_lock:
+            token = next(self._token_cycle)
+        response = self.session.post(
+            _GRAPHQL_URL,
+            json={"query": query, "variables": variables},
+            headers={"Authorization": f"bearer {token}"},
+        )
+        response.raise_for_status()
+        return response.json().get("data") or {}
+
+    def _raw_get(self, url: str, headers: Dict[str, str]) -> requests.Response:
+        """Streamed GET for raw file downloads.
+
+        With HTTP/2 enabled the body arrives over the shared httpx connection
+        and is wrapped in a requests.Response so callers see one interface.
+        """
+        if self._h2_client is None:
+            return self.session.get(url, headers=headers, stream=True)
+
+        try:
+            reply = self._h2_client.get(url, headers=headers)
+        except httpx.TimeoutException as e:
+            raise requests.Timeout(str(e)) from e
+        except httpx.TransportError as e:
+            # Offline / refused / reset: same type the requests path raises
+            raise requests.ConnectionError(str(e)) from e
+        response = requests.Response()
+        response.status_code = reply.status_code
+        response.reason = reply.reason_phrase
+        response.headers = CaseInsensitiveDict(reply.headers)
+        response.url = url
+        response._content = reply.content
+        response._content_consumed = True
+        return response
+
+    def _raw_fetch(self, url: str, headers: Dict[str, str]) -> requests.Response:
+        """_raw_get, retried with credentials when a private repo 404s."""
+        response = self._raw_get(url, headers)
+        if response.status_code == 404 and self.github_token:
+            # Private repos 404 anonymously; retry with credentials
+            response.close()
+            response = self._raw_get(url, {**headers, "Authorization": f"token {self.github_token}"})
+        return response
+
+    # Cache layout: file bodies live once under objects/ keyed by their Git
+    # blob SHA; refs/ holds one small pointer per (repo, branch, path).
+
+    @staticmethod
+    def _blob_sha(raw: bytes) -> str:
+        """Git blob SHA-1 of *raw* (matches ``git hash-object``)."""
+        return hashlib.sha1(b"blob %d\0" % len(raw) + raw).hexdigest()
+
+    def _ref_file(self, owner: str, repo: str, path: str, branch: str) -> Path:
+        """Pointer file naming the object cached for one repo file at one branch."""
+        return self.cache_dir / "refs" / f"{owner}_{repo}_{branch}_{path.replace('/', '_')}"
+
+    def _atomic_write(self, target: Path, data: bytes) -> None:
+        """Write *data* to *target* via a temp file + rename, so concurrent
+        readers never see a partially written file."""
+        target.parent.mkdir(parents=True, exist_ok=True)
+        tmp = tempfile.NamedTemporaryFile(dir=self.cache_dir, delete=False)
+        try:
+            with tmp:
+                tmp.write(data)
+            os.replace(tmp.name, target)
+        except BaseException:
+            # Disk full / permissions: don't strand the temp file in the cache
+            if os.path.exists(tmp.name):
+                os.unlink(tmp.name)
+            raise
+
+    def _write_object(self, object_file: Path, raw: bytes) -> None:
+        """Write an object body, compressed if enabled."""
+        if self.compress:
+            raw = zstd.ZstdCompressor(level=3).compress(raw)
+        self._atomic_write(object_file, raw)
+
+    def _store(self, ref_file: Path, raw: bytes) -> None:
+        """Cache *raw* as an object and point *ref_file* at it."""
+        sha = self._blob_sha(raw)
+        object_file = self._object_file(sha)
+        if not object_file.exists():
+            self._write_object(object_file, raw)
+        self._atomic_write(ref_file, sha.encode())
+        self._clear_negative(ref_file)
+
+    def _store_stream(self, ref_file: Path, response: requests.Response) -> Path:
+        """Stream a response body into the object store; return the object path.
+
+        Chunks go straight to a temp file, so the body is never held in
+        memory as a whole; the blob SHA is computed from the spooled file.
+        """
+        with tempfile.NamedTemporaryFile(dir=self.cache_dir, delete=False) as tmp:
+            for chunk in response.iter_content(chunk_size=65536):
+                tmp.write(chunk)
+            size = tmp.tell()
+        try:
+            digest = hashlib.sha1(b"blob %d\0" % size)
+            with open(tmp.name, "rb") as spooled:
+                for block in iter(lambda: spooled.read(65536), b""):
+                    digest.update(block)
+            object_file = self._object_file(digest.hexdigest())
+            if object_file.exists():
+                os.unlink(tmp.name)
+            elif self.compress:
+                with open(tmp.name, "rb") as spooled, tempfile.NamedTemporaryFile(
+                        dir=self.cache_dir, delete=False) as packed:
+                    zstd.ZstdCompressor(level=3).copy_stream(spooled, packed, size=size)
+                os.unlink(tmp.name)
+                object_file.parent.mkdir(parents=True, exist_ok=True)
+                os.replace(packed.name, object_file)
+            else:
+                object_file.parent.mkdir(parents=True, exist_ok=True)
+                os.replace(tmp.name, object_file)
+        except BaseException:
+            if os.path.exists(tmp.name):
+                os.unlink(tmp.name)
+            raise
+        self._atomic_write(ref_file, digest.hexdigest().encode())
+        return object_file
+
+    def _negative_file(self, ref_file: Path) -> Path:
+        """Marker recording that *ref_file*'s path recently 404'd/410'd."""
+        return self.cache_dir / "negative" / f"{ref_file.name}.json"
+
+    def _check_negative(self, ref_file: Path, url: str) -> None:
+        """Raise a synthetic HTTPError if *url* failed within the TTL."""
+        try:
+            entry = json.loads(self._negative_file(ref_file).read_text())
+        except (OSError, ValueError):
+            return
+        if time.time() - entry["ts"] >= entry["ttl"]:
+            return
+        response = requests.Response()
+        response.status_code = entry["status"]
+        response.url = url
+        raise requests.HTTPError(
+            f"{entry['status']} Client Error: cached negative result for url: {url}",
+            response=response,
+        )
+
+    def _write_negative(self, ref_file: Path, status: int) -> None:
+        """Remember a permanent miss so the next run doesn't re-probe it."""
+        if self.negative_ttl > 0:
+            entry = {"status": status, "ts": time.time(), "ttl": self.negative_ttl}
+            self._atomic_write(self._negative_file(ref_file), json.dumps(entry).encode())
+
+    def _clear_negative(self, ref_file: Path) -> None:
+        """Forget a remembered miss once the path has been fetched."""
+        try:
+            self._negative_file(ref_file).unlink()
+        except FileNotFoundError:
+            pass
+
+    def _resolve_ref(self, ref_file: Path, fresh_only: bool = False) -> Optional[Path]:
+        """Resolve *ref_file* to its object file, or None on a miss.
+
+        With *fresh_only*, a ref older than ``cache_ttl_seconds`` (by mtime,
+        which is bumped on every successful revalidation) counts as a miss.
+        """
+        try:
+            if fresh_only and self.cache_ttl_seconds is not None:
+                if time.time() - ref_file.stat().st_mtime >= self.cache_ttl_seconds:
+                    return None
+            object_file = self._object_file(ref_file.read_text().strip())
+        except OSError:
+            return None
+        return object_file if object_file.exists() else None
+
+    def _read_ref(self, ref_file: Path, fresh_only: bool = False) -> Optional[str]:
+        """Resolve *ref_file* to its cached body, or None on a miss."""
+        object_file = self._resolve_ref(ref_file, fresh_only)
+        if object_file is None:
+            return None
+        try:
+            return _read_object(str(object_file))
+        except (OSError, ValueError):
+            return None
+
+    @staticmethod
+    def _meta_file(ref_file: Path) -> Path:
+        """Sidecar holding the validators (ETag / Last-Modified) for *ref_file*."""
+        return ref_file.with_name(ref_file.name + ".meta.json")
+
+    def _conditional_headers(self, ref_file: Path) -> Dict[str, str]:
+        """Build If-None-Match / If-Modified-Since headers from the sidecar."""
+        meta_file = self._meta_file(ref_file)
+        if not (ref_file.exists() and meta_file.exists()):
+            return {}
+        try:
+            meta = json.loads(meta_file.read_text())
+        except (OSError, ValueError):
+            return {}
+        headers = {}
+        if meta.get("etag"):
+            headers["If-None-Match"] = meta["etag"]
+        if meta.get("last_modified"):
+            headers["If-Modified-Since"] = meta["last_modified"]
+        return headers
+
+    def _write_meta(self, ref_file: Path, response: requests.Response) -> None:
+        """Persist the response's validators next to the cached body."""
+        meta = {
+            "etag": response.headers.get("ETag"),
+            "last_modified": response.headers.get("Last-Modified"),
+        }
+        if any(meta.values()):
+            self._atomic_write(self._meta_file(ref_file), json.dumps(meta).encode())
+
     def fetch_file(self, owner: str, repo: str, path: str,
-                   branch: str = "master", use_cache: bool = True) -> str:
-        """Fetch a single file from a GitHub repo via raw URL."""
-        cache_key = f"{owner}_{repo}_{path.replace('/', '_')}_{branch}"
-        cache_file = self.cache_dir / cache_key
+                   branch: str = "master", use_cache: bool = True,
+                   revalidate: bool = False) -> str:
+        """Fetch a single file from a GitHub repo via raw URL.
+
+        A cached copy is returned as-is unless *revalidate* is set (or the
+        cache is bypassed), in which case a conditional GET is sent; a 304
+        carries no body and doesn't count against GitHub's rate limit.
+        """
+        object_file = self._ensure_cached(owner, repo, path, branch, use_cache, revalidate)
+        return _read_object(str(object_file))
+
+    def fetch_file_mmap(self, owner: str, repo: str, path: str,
+                        branch: str = "master") -> Union[mmap.mmap, bytes]:
+        """Fetch a file as a read-only memory map of its cached object.
+
+        Regexes with bytes patterns run over the mapping directly, so large
+        sources never become a Python str. Empty files can't be mapped and
+        come back as ``b""``; compressed objects come back decompressed as
+        bytes (use ``compress=False`` to keep objects mappable).
+        """
+        object_file = self._ensure_cached(owner, repo, path, branch)
+        with open(object_file, "rb") as fh:
+            if os.fstat(fh.fileno()).st_size == 0:
+                return b""
+            mapped = mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ)
+        if mapped[:4] == _ZSTD_MAGIC:
+            with mapped:
+                return _decompress(mapped[:])
+        return mapped
 
-        if use_cache and cache_file.exists():
-            return cache_file.read_text()
+    def _ensure_cached(self, owner: str, repo: str, path: str, branch: str = "master",
+                       use_cache: bool = True, revalidate: bool = False) -> Path:
+        """Make sure *path* is in the object store; return its object file."""
+        ref_file = self._ref_file(owner, repo, path, branch)
+
+        if use_cache and not revalidate:
+            object_file = self._resolve_ref(ref_file, fresh_only=True)
+            if object_file is not None:
+                return object_file
 
         # Use raw GitHub URL
         url = f"https://raw.githubusercontent.com/{owner}/{repo}/{branch}/{path}"
-        response = self.session.get(url)
+        if use_cache:
+            self._check_negative(ref_file, url)
+
+        headers = self._conditional_headers(ref_file)
+        try:
+            response = self._raw_fetch(url, headers)
+        except requests.ConnectionError:
+            # Offline: a stale copy beats no copy
+            stale = self._resolve_ref(ref_file) if use_cache else None
+            if stale is None:
+                raise
+            return stale
+        if response.status_code == 304:
+            response.close()
+            object_file = self._resolve_ref(ref_file)
+            if object_file is not None:
+                ref_file.touch()  # revalidated: fresh for another TTL
+                return object_file
+            # Object vanished under us; fetch unconditionally
+            response = self._raw_fetch(url, {})
+
+        try:
+            # Only permanent misses are remembered; 5xx may be transient
+            if response.status_code in (404, 410):
+                self._write_negative(ref_file, response.status_code)
+            response.raise_for_status()
+            object_file = self._store_stream(ref_file, response)
+            self._write_meta(ref_file, response)
+        finally:
+            response.close()
+        self._clear_negative(ref_file)
+
+        return object_file
+
+    def fetch_files_bulk(self, owner: str, repo: str, paths: List[str],
+                         branch: str = "master", use_cache: bool = True) -> Dict[str, str]:
+        """Fetch several files from one repo with a single tarball download.
+
+        Cached paths are served from disk; the rest are picked out of the
+        streamed codeload archive in one pass. Paths missing from the archive
+        are left out of the result.
+        """
+        files: Dict[str, str] = {}
+        wanted = set()
+        for path in paths:
+            cached = self._read_ref(self._ref_file(owner, repo, path, branch)) if use_cache else None
+            if cached is not None:
+                files[path] = cached
+            else:
+                wanted.add(path)
+
+        if not wanted:
+            return files
+
+        url = f"https://codeload.github.com/{owner}/{repo}/tar.gz/{branch}"
+        with self.session.get(url, stream=True) as response:
+            response.raise_for_status()
+            with tarfile.open(fileobj=response.raw, mode="r|gz") as archive:
+                for member in archive:
+                    if not member.isfile():
+                        continue
+                    # Archive entries are prefixed with "<repo>-<ref>/"
+                    path = member.name.split("/", 1)[-1]
+                    if path not in wanted:
+                        continue
+                    extracted = archive.extractfile(member)
+                    if extracted is None:
+                        continue
+                    raw = extracted.read()
+                    self._store(self._ref_file(owner, repo, path, branch), raw)
+                    files[path] = raw.decode("utf-8", "replace")
+                    wanted.discard(path)
+                    if not wanted:
+                        break
+
+        return files
+
+    def fetch_files_graphql(self, owner: str, repo: str, paths: List[str],
+                            branch: str = "master", use_cache: bool = True) -> Dict[str, str]:
+        """Fetch several files from one repo in a single GraphQL round trip.
+
+        Cached paths are served from disk; the rest are requested as aliased
+        ``object(expression: "<branch>:<path>")`` fields of one query and
+        stored like raw downloads. Blobs GitHub returns truncated (or without
+        text) are fetched raw instead. Missing paths are left out of the
+        result. GraphQL needs credentials, so without a token this falls
+        back to one raw fetch per path.
+        """
+        files: Dict[str, str] = {}
+        if not self._tokens:
+            for path in paths:
+                try:
+                    files[path] = self.fetch_file(owner, repo, path, branch, use_cache)
+                except requests.HTTPError:
+                    continue
+            return files
+
+        wanted = []
+        for path in paths:
+            cached = self._read_ref(self._ref_file(owner, repo, path, branch),
+                                    fresh_only=True) if use_cache else None
+            if cached is not None:
+                files[path] = cached
+            else:
+                wanted.append(path)
+
+        if not wanted:
+            return files
+
+        fields = " ".join(
+            f"f{i}: object(expression: {json.dumps(f'{branch}:{path}')}) {{ ... on Blob {{ text isTruncated }} }}"
+            for i, path in enumerate(wanted)
+        )
+        data = self._graphql(
+            "query($owner: String!, $name: String!) "
+            f"{{ repository(owner: $owner, name: $name) {{ {fields} }} }}",
+            {"owner": owner, "name": repo},
+        )
+        repository = data.get("repository") or {}
+
+        for i, path in enumerate(wanted):
+            blob = repository.get(f"f{i}")
+            if not blob:
+                continue
+            if blob.get("text") is None or blob.get("isTruncated"):
+                # Large blobs come back cut short; never cache a partial file
+                try:
+                    files[path] = self.fetch_file(owner, repo, path, branch, use_cache)
+                except requests.HTTPError:
+                    pass
+                continue
+            self._store(self._ref_file(owner, repo, path, branch), blob["text"].encode("utf-8"))
+            files[path] = blob["text"]
+        return files
+
+    # ---- Git tree / blob pipeline ----
+
+    def _resolve_tree(self, owner: str, repo: str,
+                      branch: str = "master") -> Tuple[Dict[str, str], bool]:
+        """Map every file path on *branch* to its blob SHA with one Trees API call.
+
+        Returns ``(tree, truncated)``; GitHub cuts the recursive listing
+        short on very large repos, so a path missing from a truncated tree
+        may still exist. Memoized per instance for ``cache_ttl_seconds``, so
+        several EIPs on one client share the lookup but a moved branch is
+        eventually re-resolved.
+        """
+        key = (owner, repo, branch)
+        memo = self._trees.get(key)
+        if memo is not None and (self.cache_ttl_seconds is None
+                                 or time.time() - memo[0] < self.cache_ttl_seconds):
+            return memo[2], memo[1]
+
+        url = f"https://api.github.com/repos/{owner}/{repo}/git/trees/{branch}"
+        response = self._api_get(url, params={"recursive": "1"})
+        response.raise_for_status()
+        listing = response.json()
+        tree = {
+            entry["path"]: entry["sha"]
+            for entry in listing.get("tree", [])
+            if entry.get("type") == "blob"
+        }
+        truncated = bool(listing.get("truncated"))
+        self._trees[key] = (time.time(), truncated, tree)
+        return tree, truncated
+
+    def _object_file(self, sha: str) -> Path:
+        """Content-addressed cache location for a Git blob."""
+        return self.cache_dir / "objects" / sha[:2] / sha[2:]
+
+    def fetch_blob(self, owner: str, repo: str, sha: str) -> str:
+        """Fetch a Git blob by SHA. Blobs are immutable, so a cached copy is
+        always valid regardless of branch or age."""
+        object_file = self._object_file(sha)
+        if object_file.exists():
+            return _read_object(str(object_file))
+
+        url = f"https://api.github.com/repos/{owner}/{repo}/git/blobs/{sha}"
+        response = self._api_get(url, headers={"Accept": "application/vnd.github.raw"})
         response.raise_for_status()
 
-        content = response.text
-        cache_file.write_text(content)
+        raw = response.content
+        self._write_object(object_file, raw)
+        return raw.decode("utf-8", "replace")
 
-        return content
+    def fetch_files_via_tree(self, owner: str, repo: str, paths: List[str],
+                             branch: str = "master") -> Dict[str, str]:
+        """Fetch *paths* as blobs resolved from the branch tree.
+
+        Paths not present on the branch are left out of the result. When
+        the tree listing was truncated, unlisted paths are tried as raw
+        downloads instead.
+        """
+        tree, truncated = self._resolve_tree(owner, repo, branch)
+        present = [p for p in paths if p in tree]
+        unlisted = [p for p in paths if p not in tree] if truncated else []
+        if not (present or unlisted):
+            return {}
+
+        def fetch(path: str) -> Optional[str]:
+            if path in tree:
+                return self.fetch_blob(owner, repo, tree[path])
+            try:
+                return self.fetch_file(owner, repo, path, branch)
+            except requests.HTTPError:
+                return None
+
+        wanted = present + unlisted
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(wanted))) as pool:
+            contents = pool.map(fetch, wanted)
+            return {p: body for p, body in zip(wanted, contents) if body is not None}
 
     def fetch_geth_file(self, path: str, branch: str = "master",
                         use_cache: bool = True) -> str:
@@ -151,8 +713,8 @@ class CodeFetcher:
 
     # ---- Generic EIP implementation fetcher ----
 
-    def fetch_eip_implementation(self, client: str, eip_number: int) -> Dict[str, str]:
-        """Fetch all registered implementation files for an EIP/client pair."""
+    def _eip_file_paths(self, client: str, eip_number: int) -> Tuple[str, str, Tuple[str, ...]]:
+        """Resolve (owner, repo, paths) for an EIP/client pair, validating both."""
         if client not in self.CLIENTS:
             raise ValueError(
                 f"Unknown client: {client}. "
@@ -160,8 +722,7 @@ class CodeFetcher:
             )
 
         client_info = self.CLIENTS[client]
-        eip_files_map = client_info.get("eip_files", {})
-        file_paths = eip_files_map.get(eip_number, [])
+        file_paths = client_info.get("eip_files", {}).get(eip_number, ())
 
         if not file_paths:
             raise ValueError(
@@ -170,19 +731,104 @@ class CodeFetcher:
                 f"{', '.join(str(e) for e in self.supported_eips_for_client(client))}"
             )
 
-        # Parse owner/repo from URL
-        url_parts = client_info["url"].rstrip('/').split('/')
-        owner, repo = url_parts[-2], url_parts[-1]
+        return client_info["owner"], client_info["repo"], file_paths
 
-        files: Dict[str, str] = {}
-        for file_path in file_paths:
+    # Bulk strategies for fetch_eip_implementation(); "raw" is per-file.
+    FETCH_STRATEGIES = ("raw", "tarball", "tree", "graphql")
+
+    def fetch_eip_implementation(self, client: str, eip_number: int,
+                                 strategy: str = "raw") -> Dict[str, str]:
+        """Fetch all registered implementation files for an EIP/client pair.
+
+        *strategy* picks how uncached files are downloaded: ``"raw"`` issues
+        one raw.githubusercontent request per file (no API rate limit),
+        ``"tarball"`` pulls them out of one repository archive (wasteful for
+        very large repos), ``"tree"`` resolves blob SHAs with one Git
+        Trees call and fetches content-addressed blobs that never go stale,
+        and ``"graphql"`` pulls every file in one GraphQL query (needs a
+        token; otherwise it behaves like ``"raw"``).
+        """
+        if strategy not in self.FETCH_STRATEGIES:
+            raise ValueError(
+                f"Unknown fetch strategy: {strategy}. "
+                f"Supported: {', '.join(self.FETCH_STRATEGIES)}"
+            )
+
+        owner, repo, file_paths = self._eip_file_paths(client, eip_number)
+
+        if strategy != "raw":
+            bulk_fetch = {
+                "tarball": self.fetch_files_bulk,
+                "tree": self.fetch_files_via_tree,
+                "graphql": self.fetch_files_graphql,
+            }[strategy]
             try:
-                content = self.fetch_file(owner, repo, file_path)
-                files[file_path] = content
-            except requests.HTTPError as e:
-                files[file_path] = f"# Error fetching file: {e}"
+                fetched = bulk_fetch(owner, repo, file_paths)
+            except (requests.RequestException, tarfile.TarError) as e:
+                return {p: f"# Error fetching file: {e}" for p in file_paths}
+            return {
+                p: fetched.get(p, f"# Error fetching file: {p} not found in {client}")
+                for p in file_paths
+            }
 
-        return files
+        ref_files = {p: self._ref_file(owner, repo, p, "master") for p in file_paths}
+        fetched: Dict[str, str] = {}
+
+        # Overlap disk reads for cache hits (helps on network-mounted caches)
+        with ThreadPoolExecutor(max_workers=min(4, len(file_paths))) as pool:
+            contents = pool.map(lambda p: self._read_ref(ref_files[p], fresh_only=True), file_paths)
+            for file_path, cached in zip(file_paths, contents):
+                if cached is not None:
+                    fetched[file_path] = cached
+        missing = [p for p in file_paths if p not in fetched]
+
+        # Network fetches are independent GETs against one host; run them
+        # side by side over the session's shared connection pool.
+        if missing:
+            with ThreadPoolExecutor(max_workers=min(self.max_workers, len(missing))) as pool:
+                futures = {
+                    pool.submit(self.fetch_file, owner, repo, file_path): file_path
+                    for file_path in missing
+                }
+                for future in as_completed(futures):
+                    file_path = futures[future]
+                    try:
+                        fetched[file_path] = future.result()
+                    except requests.RequestException as e:
+                        fetched[file_path] = f"# Error fetching file: {e}"
+
+        # Preserve registry order
+        return {p: fetched[p] for p in file_paths}
+
+    def fetch_eip_implementations(self, pairs: Sequence[Tuple[str, int]],
+                                  max_workers: Optional[int] = None) -> Dict[Tuple[str, int], Dict[str, str]]:
+        """Fetch several (client, EIP) pairs through one bounded worker pool.
+
+        Files are deduplicated across pairs and every download shares the
+        same pool, so fanning out over many clients/EIPs costs one round of
+        parallel GETs instead of one round per pair. *max_workers* defaults
+        to the fetcher's own limit.
+        """
+        max_workers = max_workers or self.max_workers
+        resolved = {pair: self._eip_file_paths(*pair) for pair in pairs}
+        jobs = {(owner, repo, path)
+                for owner, repo, paths in resolved.values() for path in paths}
+
+        fetched: Dict[Tuple[str, str, str], str] = {}
+        if jobs:
+            with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(jobs)))) as pool:
+                futures = {pool.submit(self.fetch_file, *job): job for job in jobs}
+                for future in as_completed(futures):
+                    job = futures[future]
+                    try:
+                        fetched[job] = future.result()
+                    except requests.RequestException as e:
+                        fetched[job] = f"# Error fetching file: {e}"
+
+        return {
+            pair: {p: fetched[(owner, repo, p)] for p in paths}
+            for pair, (owner, repo, paths) in resolved.items()
+        }
 
     # ---- Legacy convenience methods ----
 
@@ -204,6 +850,56 @@ class CodeFetcher:
 
     # ---- Search & clone ----
 
+    # GitHub caps search queries at 256 chars (excluding qualifiers) and
+    # five boolean operators, i.e. six OR-ed terms.
+    SEARCH_MAX_CHARS = 256
+    SEARCH_MAX_TERMS = 6
+    SEARCH_ATTEMPTS = 3
+
+    @staticmethod
+    def _rate_limit_wait(response: requests.Response, fallback: float) -> Optional[float]:
+        """Seconds to wait before retrying a rate-limited response, else None.
+
+        Retry-After may be delta-seconds or an HTTP-date; an unparseable
+        value falls back to *fallback*.
+        """
+        retry_after = response.headers.get("Retry-After")
+        if retry_after is not None:
+            try:
+                return max(0.0, float(retry_after))
+            except ValueError:
+                pass
+            try:
+                when = parsedate_to_datetime(retry_after)
+            except (TypeError, ValueError):
+                return fallback
+            if when.tzinfo is None:
+                when = when.replace(tzinfo=timezone.utc)  # "-0000" zone
+            return max(0.0, when.timestamp() - time.time())
+        if response.headers.get("X-RateLimit-Remaining") == "0":
+            reset = response.headers.get("X-RateLimit-Reset")
+            return max(0.0, float(reset) - time.time()) if reset else fallback
+        return fallback if response.status_code == 429 else None
+
+    def _search_code(self, search_query: str) -> List[Dict[str, Any]]:
+        """Run one code search, backing off on secondary rate limits."""
+        url = "https://api.github.com/search/code"
+        params = {"q": search_query, "per_page": 100}
+
+        delay = 1.0
+        for attempt in range(self.SEARCH_ATTEMPTS):
+            response = self._api_get(url, params=params)
+            if response.status_code not in (403, 429) or attempt == self.SEARCH_ATTEMPTS - 1:
+                break
+            wait = self._rate_limit_wait(response, delay)
+            if wait is None:
+                break  # a plain 403 (bad token, no access) won't improve
+            time.sleep(wait)
+            delay *= 2
+        response.raise_for_status()
+
+        return response.json().get("items", [])
+
     def search_repository(self, owner: str, repo: str, query: str,
                           language: Optional[str] = None) -> List[Dict[str, Any]]:
         """Search for code in a GitHub repo via the search API."""
@@ -211,28 +907,70 @@ class CodeFetcher:
         if language:
             search_query += f" language:{language}"
 
-        url = "https://api.github.com/search/code"
-        params = {"q": search_query, "per_page": 10}
+        return self._search_code(search_query)
 
-        response = self.session.get(url, params=params)
-        response.raise_for_status()
+    def search_repository_many(self, owner: str, repo: str, queries: List[str],
+                               language: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Search for several terms with as few API calls as possible.
 
-        return response.json().get("items", [])
+        Terms are OR-ed together in groups that fit GitHub's query limits;
+        hits found by more than one group are returned once.
+        """
+        groups: List[List[str]] = []
+        length = 0
+        for query in queries:
+            term = f"({query})"
+            if (not groups or len(groups[-1]) >= self.SEARCH_MAX_TERMS
+                    or length + len(term) + 4 > self.SEARCH_MAX_CHARS):
+                groups.append([])
+                length = 0
+            groups[-1].append(term)
+            length += len(term) + 4  # " OR "
+
+        seen = set()
+        items: List[Dict[str, Any]] = []
+        for group in groups:
+            for item in self.search_repository(owner, repo, " OR ".join(group), language):
+                key = item.get("sha") or item.get("path")
+                if key not in seen:
+                    seen.add(key)
+                    items.append(item)
+        return items
+
+    # git clone options per clone mode. Partial clones (treeless/blobless)
+    # defer object downloads until a tree or blob is actually touched.
+    CLONE_MODES: Dict[str, List[str]] = {
+        "full": [],
+        "shallow": ["--depth=1", "--single-branch", "--no-tags"],
+        "treeless": ["--depth=1", "--filter=tree:0", "--single-branch", "--no-tags"],
+        "blobless": ["--depth=1", "--filter=blob:none", "--single-branch", "--no-tags"],
+    }
 
     def clone_repository(self, url: str, target_dir: Optional[str] = None,
-                         branch: str = "master", shallow: bool = True) -> str:
-        """Clone a repo locally for deeper analysis. Requires gitpython."""
+                         branch: str = "master", shallow: bool = True,
+                         mode: Optional[str] = None) -> str:
+        """Clone a repo locally for deeper analysis. Requires gitpython.
+
+        *mode* is one of ``CLONE_MODES``; when omitted, *shallow* picks
+        between ``"shallow"`` and ``"full"``. Don't ``git fetch`` into a
+        depth-1 clone without ``--depth=1``, or git backfills history.
+        """
         if not GIT_AVAILABLE:
             raise RuntimeError("GitPython not installed. Install with: pip install gitpython")
 
+        if mode is None:
+            mode = "shallow" if shallow else "full"
+        if mode not in self.CLONE_MODES:
+            raise ValueError(
+                f"Unknown clone mode: {mode}. "
+                f"Supported: {', '.join(self.CLONE_MODES)}"
+            )
+
         if target_dir is None:
             target_dir = tempfile.mkdtemp(prefix="prspec_")
 
-        clone_args = {"branch": branch}
-        if shallow:
-            clone_args["depth"] = 1
-
-        Repo.clone_from(url, target_dir, **clone_args)
+        Repo.clone_from(url, target_dir, branch=branch,
+                        multi_options=self.CLONE_MODES[mode])
 
         return target_dir
 
@@ -242,13 +980,66 @@ class CodeFetcher:
 
     def clear_cache(self):
         """Clear the code cache"""
-        import shutil
-        if self.cache_dir.exists():
-            shutil.rmtree(self.cache_dir)
+        if not self.cache_dir.exists():
             self.cache_dir.mkdir(parents=True, exist_ok=True)
+            return
+        # Empty the directory in place rather than removing and recreating it
+        for entry in self.cache_dir.iterdir():
+            if entry.is_dir():
+                shutil.rmtree(entry)
+            else:
+                entry.unlink()
 
     def list_cached_files(self) -> List[str]:
         """List all cached code files"""
         if not self.cache_dir.exists():
             return []
-        return [f.name for f in self.cache_dir.iterdir() if f.is_file()]
+        refs_dir = self.cache_dir / "refs"
+        if not refs_dir.exists():
+            return []
+        return [f.name for f in refs_dir.iterdir()
+                if f.is_file() and not f.name.endswith(".meta.json")]
+
+
+def _decompress(data: bytes) -> bytes:
+    """Undo object compression; uncompressed objects pass through."""
+    if data[:4] != _ZSTD_MAGIC:
+        return data
+    if not ZSTD_AVAILABLE:
+        raise RuntimeError("Cache holds zstd-compressed objects. Install with: pip install zstandard")
+    return zstd.ZstdDecompressor().decompressobj().decompress(data)
+
+
+@lru_cache(maxsize=512)
+def _read_object(object_path: str) -> str:
+    """Read and decode a cached object. Objects are content-addressed and
+    never rewritten, so repeat reads within a process can skip the disk."""
+    return _decompress(Path(object_path).read_bytes()).decode("utf-8", "replace")
+
+
+# Derived views of the registry, filled in by _freeze_clients()
+_CLIENT_LANGUAGES: Dict[str, str] = {}
+_SUPPORTED_EIPS: Dict[str, Tuple[int, ...]] = {}
+
+
+def _freeze_clients() -> None:
+    """Derive owner/repo from each client URL, then freeze the registry.
+
+    Runs once at import. Consumers get read-only views, so nothing can
+    mutate the registry out from under the precomputed lookups.
+    """
+    frozen = {}
+    for client, info in CodeFetcher.CLIENTS.items():
+        owner, repo = info["url"].rstrip("/").split("/")[-2:]
+        eip_files = MappingProxyType({
+            eip: tuple(paths) for eip, paths in info.get("eip_files", {}).items()
+        })
+        frozen[client] = MappingProxyType(
+            {**info, "owner": owner, "repo": repo, "eip_files": eip_files}
+        )
+        _CLIENT_LANGUAGES[client] = info["language"]
+        _SUPPORTED_EIPS[client] = tuple(sorted(eip_files))
+    CodeFetcher.CLIENTS = MappingProxyType(frozen)
+
+
+_freeze_clients()
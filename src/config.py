@@ -1,12 +1,32 @@
 """Configuration management for PRSpec."""
 
+import json
 import os
+from functools import cached_property, lru_cache
 from pathlib import Path
 from typing import Any, Dict, Optional
 
 import yaml
 from dotenv import load_dotenv
 
+# libyaml-backed loader when available; several times faster than pure Python
+_SafeLoader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
+_DEFAULT_GEMINI = {
+    "model": "gemini-2.5-pro",
+    "max_output_tokens": 8192,
+    "temperature": 0.1,
+}
+_DEFAULT_OPENAI = {
+    "model": "gpt-4-turbo-preview",
+    "max_tokens": 4096,
+    "temperature": 0.1,
+}
+_DEFAULT_OUTPUT = {
+    "format": "json",
+    "directory": "output",
+}
+
 
 class Config:
     """Configuration manager for PRSpec"""
@@ -17,30 +37,35 @@ class Config:
         load_dotenv()
 
         # Find config file
-        if config_path is None:
+        discovered = config_path is None
+        if discovered:
             config_path = self._find_config_file()
 
         self.config_path = Path(config_path)
+        self._discovered = discovered
         self._config = self._load_config()
+        self._eip_focus_areas: Dict[int, list] = {}
 
     def _find_config_file(self) -> str:
         """Find config.yaml in current or parent directories"""
-        search_paths = [
-            Path.cwd() / "config.yaml",
-            Path.cwd().parent / "config.yaml",
-            Path(__file__).parent.parent / "config.yaml",
-        ]
-
-        for path in search_paths:
-            if path.exists():
-                return str(path)
-
-        raise FileNotFoundError("config.yaml not found")
+        return _find_config_file(str(Path.cwd()))
 
     def _load_config(self) -> Dict[str, Any]:
-        """Load configuration from YAML file"""
+        """Load configuration from YAML file, or a sibling config.json if present.
+
+        The JSON copy is only used for the auto-discovered config and only
+        when it is at least as new as the YAML; an explicit *config_path*
+        is always read as given, so a stale JSON never shadows edits.
+        """
+        json_path = self.config_path.with_suffix(".json")
+        if self._discovered and json_path != self.config_path:
+            try:
+                if json_path.stat().st_mtime >= self.config_path.stat().st_mtime:
+                    return json.loads(json_path.read_text())
+            except OSError:
+                pass
         with open(self.config_path, 'r') as f:
-            return yaml.safe_load(f)
+            return yaml.load(f, Loader=_SafeLoader)
 
     @property
     def llm_provider(self) -> str:
@@ -72,53 +97,50 @@ class Config:
         """Get GitHub token from environment (optional)"""
         return os.getenv("GITHUB_TOKEN")
 
-    @property
+    @cached_property
     def gemini_config(self) -> Dict[str, Any]:
         """Get Gemini-specific configuration"""
-        return self._config.get("llm", {}).get("gemini", {
-            "model": "gemini-2.5-pro",
-            "max_output_tokens": 8192,
-            "temperature": 0.1
-        })
+        return self._config.get("llm", {}).get("gemini", dict(_DEFAULT_GEMINI))
 
-    @property
+    @cached_property
     def openai_config(self) -> Dict[str, Any]:
         """Get OpenAI-specific configuration"""
-        return self._config.get("llm", {}).get("openai", {
-            "model": "gpt-4-turbo-preview",
-            "max_tokens": 4096,
-            "temperature": 0.1
-        })
+        return self._config.get("llm", {}).get("openai", dict(_DEFAULT_OPENAI))
 
-    @property
+    @cached_property
     def repositories(self) -> Dict[str, Any]:
         """Get repository configurations"""
         return self._config.get("repositories", {})
 
-    @property
+    @cached_property
     def analysis_config(self) -> Dict[str, Any]:
         """Get analysis configuration"""
         return self._config.get("analysis", {})
 
-    @property
+    @cached_property
+    def max_concurrency(self) -> int:
+        """Upper bound on parallel LLM requests per analysis run"""
+        return int(self.analysis_config.get("max_concurrency", 5))
+
+    @cached_property
     def focus_areas(self) -> list:
         """Get default focus areas for analysis"""
         return self.analysis_config.get("focus_areas", [])
 
     def get_eip_focus_areas(self, eip_number: int) -> list:
         """Focus areas for a specific EIP, falling back to defaults."""
-        eips_config = self._config.get("eips", {})
-        eip_config = eips_config.get(eip_number, eips_config.get(str(eip_number), {}))
-        areas = eip_config.get("focus_areas", [])
-        return areas if areas else self.focus_areas
-
-    @property
+        areas = self._eip_focus_areas.get(eip_number)
+        if areas is None:
+            eips_config = self._config.get("eips", {})
+            eip_config = eips_config.get(eip_number, eips_config.get(str(eip_number), {}))
+            areas = eip_config.get("focus_areas", []) or self.focus_areas
+            self._eip_focus_areas[eip_number] = areas
+        return areas
+
+    @cached_property
     def output_config(self) -> Dict[str, Any]:
         """Get output configuration"""
-        return self._config.get("output", {
-            "format": "json",
-            "directory": "output"
-        })
+        return self._config.get("output", dict(_DEFAULT_OUTPUT))
 
     def get_repo_config(self, repo_name: str) -> Dict[str, Any]:
         """Look up a named repository config block."""
@@ -131,6 +153,22 @@ class Config:
         return f"Config(provider={self.llm_provider}, config_path={self.config_path})"
 
 
+@lru_cache(maxsize=8)
+def _find_config_file(cwd: str) -> str:
+    """Resolve config.yaml for *cwd*; memoized so repeat Config() calls skip the stats."""
+    search_paths = [
+        Path(cwd) / "config.yaml",
+        Path(cwd).parent / "config.yaml",
+        Path(__file__).parent.parent / "config.yaml",
+    ]
+
+    for path in search_paths:
+        if path.exists():
+            return str(path)
+
+    raise FileNotFoundError("config.yaml not found")
+
+
 # Convenience function for quick config access
 def get_config(config_path: Optional[str] = None) -> Config:
     """Get a Config instance"""
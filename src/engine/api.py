@@ -13,10 +13,16 @@ from __future__ import annotations
 import json
 import os
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Sequence
 
 from ..parser import CodeParser
 
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
 # Attempt to read the package version; fall back to "dev".
 try:
     from src import __version__ as _prspec_version
@@ -82,7 +88,7 @@ _DEFAULT_EIP_KEYWORDS: Dict[int, List[str]] = {
 }
 
 
-def _get_eip_keywords() -> Dict[int, List[str]]:
+def _get_eip_keywords() -> Dict[int, Sequence[str]]:
     """Return the canonical keyword map, falling back to defaults."""
     try:
         from ..parser import CodeParser as _CP
@@ -140,7 +146,7 @@ def scan_path(
         raise FileNotFoundError(f"Target path does not exist: {target_path}")
 
     files = _discover_files(target_path)
-    parser = CodeParser()
+    parser = CodeParser(use_tree_sitter=False)
     eip_keywords = _get_eip_keywords()
 
     findings: List[Dict[str, Any]] = []
@@ -215,6 +221,12 @@ def scan_path(
     }
 
     if output == "json-pretty":
-        result["_json"] = json.dumps(result, indent=2)
+        pretty = None
+        if ORJSON_AVAILABLE:
+            try:
+                pretty = orjson.dumps(result, option=orjson.OPT_INDENT_2).decode()
+            except orjson.JSONEncodeError:
+                pass  # e.g. integers beyond 64 bits; stdlib json handles them
+        result["_json"] = pretty if pretty is not None else json.dumps(result, indent=2)
 
     return result
@@ -1,11 +1,227 @@
 """Source code parser — extracts functions, classes, and EIP-relevant blocks."""
 
+import ast
+import hashlib
+import json
 import re
+import sqlite3
+import sys
+import threading
+from bisect import bisect_left, bisect_right
 from dataclasses import dataclass
-from typing import Any, Dict, List, Optional
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Set, Tuple, Union
+
+# Compiled once at import and shared by every CodeParser.
+# Go return-type group handles: single word, pointer (*big.Int), tuple ((a, b)), or nothing.
+_FUNC_GO = re.compile(
+    r'^[ \t]*func\s+(?:\((\w+)\s+\*?(\w+)\)\s+)?(\w+)\s*\(([^)]*)\)\s*(?:\(([^)]*)\)|(\*?\w+(?:\.\w+)?))?(?:\s*)\{',
+    re.MULTILINE,
+)
+_BRACES = re.compile(r'[{}]')
+_NEWLINE = re.compile('\n')
+# Snippets shorter than this reparse faster than an SQLite lookup + commit
+_CACHE_MIN_LINES = 64
+# Bump when a parser change alters the blocks produced for the same input,
+# so persistent parse-cache rows from older versions are ignored
+_PARSE_CACHE_VERSION = 2
+_FUNC_PY = re.compile(r'^(\s*)def\s+(\w+)\s*\(([^)]*)\)\s*(?:->.*)?:')
+_CLASS_PY = re.compile(r'^(\s*)class\s+(\w+)\s*(?:\([^)]*\))?\s*:')
+_FUNC_CS = re.compile(
+    r'(?:public|private|protected|internal|static|override|virtual|abstract|async|sealed|partial)\s+'
+    r'(?:[\w<>\[\],\s\?]+\s+)?(\w+)\s*(?:<[^>]+>)?\s*\([^)]*\)'
+)
+_CLASS_CS = re.compile(
+    r'(?:public|private|protected|internal|static|abstract|sealed|partial)\s+'
+    r'(?:class|struct|interface|record|enum)\s+(\w+)'
+)
+_FUNC_JAVA = re.compile(
+    r'(?:public|private|protected|static|final|abstract|synchronized|native)\s+'
+    r'(?:[\w<>\[\],\s\?]+\s+)?(\w+)\s*\([^)]*\)'
+)
+_CLASS_JAVA = re.compile(
+    r'(?:public|private|protected|static|final|abstract)\s+'
+    r'(?:class|interface|enum|record)\s+(\w+)'
+)
+
+# Comment scanner: jump between the tokens that can open a comment or a
+# string, so comment markers inside string literals are skipped.
+_PY_OPENERS = re.compile(r'#|"""|\'\'\'|"|\'')
+_GO_OPENERS = re.compile(r'//|/\*|"|`|\'')
+# Rest of a one-line quoted literal, honouring backslash escapes; an
+# escaped newline (Python's backslash continuation) keeps the literal open
+_QUOTED_TAIL = {
+    '"': re.compile(r'(?:[^"\\\n]|\\[\s\S])*"?'),
+    "'": re.compile(r"(?:[^'\\\n]|\\[\s\S])*'?"),
+}
+
+# tree-sitter queries; the capture name on the outer node is the block type.
+_TS_QUERIES = {
+    "go": """
+        (function_declaration name: (identifier) @name) @function
+        (method_declaration name: (field_identifier) @name) @method
+    """,
+    "python": """
+        (class_definition name: (identifier) @name) @class
+        (function_definition name: (identifier) @name) @function
+        (class_definition body: (block
+            (function_definition name: (identifier) @name) @method))
+        (class_definition body: (block (decorated_definition
+            definition: (function_definition name: (identifier) @name) @method)))
+    """,
+}
+
+
+try:
+    from tree_sitter import QueryCursor as _QueryCursor
+except ImportError:
+    _QueryCursor = None
+
+
+def _query_matches(query, node):
+    """Run a tree-sitter query; QueryCursor arrived in tree-sitter 0.24."""
+    if _QueryCursor is None:
+        return query.matches(node)
+    return _QueryCursor(query).matches(node)
+
+
+@lru_cache(maxsize=None)
+def _ts_grammars() -> Dict[str, Tuple[Any, Any]]:
+    """Load each tree-sitter grammar and compile its query, once per process.
+
+    Languages and queries are immutable and shared by every CodeParser;
+    only the (stateful) Parser objects are built per instance. Raises
+    ImportError/TypeError like the bindings do, and isn't cached then.
+    """
+    import tree_sitter_go
+    import tree_sitter_python
+    from tree_sitter import Language, Query
+
+    # Modern tree-sitter API (>= 0.22): Language() takes a single arg
+    grammars = {}
+    for language, module in (("python", tree_sitter_python), ("go", tree_sitter_go)):
+        lang = Language(module.language())
+        grammars[language] = (lang, Query(lang, _TS_QUERIES[language]))
+    return grammars
+
+
+try:
+    import hyperscan
+    HYPERSCAN_AVAILABLE = True
+except ImportError:
+    HYPERSCAN_AVAILABLE = False
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+
+@lru_cache(maxsize=None)
+def _keyword_pattern(keywords: Tuple[str, ...]) -> re.Pattern:
+    """One case-insensitive alternation over *keywords*.
+
+    Matching ignores case in the C matcher, so callers never build a
+    lowercased copy of a block body, and search() stops at the first hit.
+    """
+    return re.compile('|'.join(map(re.escape, keywords)), re.IGNORECASE)
+
+
+@lru_cache(maxsize=64)
+def _eip_router(keyword_sets: Tuple[Tuple[int, Tuple[str, ...]], ...]
+                ) -> Callable[[str, str], List[int]]:
+    """Build a scanner returning which EIPs' keywords occur in (name, body).
+
+    One alternation with a named group per EIP, wrapped in a lookahead so
+    matches may overlap. At a given offset only the first matching group
+    reports, so if one EIP's keyword is a prefix of another's, the unseen
+    EIPs are re-checked with their own pattern.
+    """
+    groups = {f"e{i}": eip for i, (eip, _) in enumerate(keyword_sets)}
+    pattern = re.compile(
+        "(?=" + "|".join(
+            f"(?P<e{i}>{'|'.join(map(re.escape, keywords))})"
+            for i, (_, keywords) in enumerate(keyword_sets)
+        ) + ")",
+        re.IGNORECASE,
+    )
+    overlapping = any(
+        b.lower().startswith(a.lower())
+        for i, (_, first) in enumerate(keyword_sets)
+        for j, (_, second) in enumerate(keyword_sets) if i != j
+        for a in first for b in second
+    )
+
+    def route(name: str, content: str) -> List[int]:
+        pending = set(groups.values())
+        hits: List[int] = []
+        for text in (name, content):
+            for match in pattern.finditer(text):
+                eip = groups[match.lastgroup]
+                if eip in pending:
+                    pending.discard(eip)
+                    hits.append(eip)
+                    if not pending:
+                        return hits
+        if overlapping:
+            for eip, keywords in keyword_sets:
+                if eip in pending:
+                    kw = _keyword_pattern(keywords)
+                    if kw.search(name) or kw.search(content):
+                        hits.append(eip)
+        return hits
+
+    return route
+
+
+@lru_cache(maxsize=8)
+def _hyperscan_db(keyword_sets: Tuple[Tuple[int, Tuple[str, ...]], ...]):
+    """Compile every EIP's keywords into one Hyperscan database.
+
+    Pattern ids index the returned EIP list; SINGLEMATCH reports each
+    keyword at most once per scan.
+    """
+    expressions, eips = [], []
+    for eip, keywords in keyword_sets:
+        for keyword in keywords:
+            expressions.append(re.escape(keyword).encode())
+            eips.append(eip)
+    db = hyperscan.Database()
+    db.compile(
+        expressions=expressions,
+        ids=list(range(len(expressions))),
+        flags=[hyperscan.HS_FLAG_CASELESS | hyperscan.HS_FLAG_SINGLEMATCH] * len(expressions),
+    )
+    return db, eips
+
+
+def _hyperscan_hits(db, ids: List[int], chunks: Iterable[bytes], wanted: int) -> Set[int]:
+    """EIPs whose keywords occur in any of *chunks*, scanned with *db*.
+
+    Scanning stops as soon as *wanted* distinct EIPs have matched.
+    """
+    hits: Set[int] = set()
 
+    def on_match(pattern_id, start, end, flags, context=None):
+        hits.add(ids[pattern_id])
+        return len(hits) == wanted  # truthy stops the scan
 
-@dataclass
+    for chunk in chunks:
+        try:
+            db.scan(chunk, match_event_handler=on_match)
+        except hyperscan.ScanTerminated:
+            break
+    return hits
+
+
+# Slotted dataclasses (3.10+): no per-instance __dict__ for the many blocks
+# a large file yields
+_SLOTS = {"slots": True} if sys.version_info >= (3, 10) else {}
+
+
+@dataclass(**_SLOTS)
 class CodeBlock:
     """Represents a parsed code block (function, class, etc.)"""
     name: str
@@ -30,33 +246,78 @@ class CodeBlock:
         }
 
 
+_BLOCK_FIELDS = tuple(CodeBlock.__dataclass_fields__)
+# Parse-cache schema: rows are JSON arrays of these fields, so the field
+# list is part of every row's key and a CodeBlock layout change misses
+_CACHE_SCHEMA = b"%d:%s" % (_PARSE_CACHE_VERSION, ",".join(_BLOCK_FIELDS).encode())
+
+
+def _dump_blocks(blocks: List[CodeBlock]) -> bytes:
+    """Serialise blocks for the parse cache as JSON (orjson when installed).
+
+    Plain data only: the cache file may be shared, so rows must never be
+    able to run code when read back the way pickle could.
+    """
+    rows = [[getattr(b, f) for f in _BLOCK_FIELDS] for b in blocks]
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(rows)
+    return json.dumps(rows, separators=(",", ":")).encode("utf-8")
+
+
+def _load_blocks(data: bytes) -> List[CodeBlock]:
+    """Inverse of _dump_blocks."""
+    rows = orjson.loads(data) if ORJSON_AVAILABLE else json.loads(data)
+    return [CodeBlock(*row) for row in rows]
+
+
 class CodeParser:
     """
     Multi-language code parser for extracting functions and classes.
-    Uses regex patterns for simplicity; can be enhanced with tree-sitter.
+    Uses tree-sitter where a grammar is installed, regex patterns otherwise.
     """
 
-    def __init__(self, use_tree_sitter: bool = False):
-        """Optionally enable tree-sitter for more accurate parsing."""
+    def __init__(self, use_tree_sitter: bool = True, cache_dir: Optional[str] = None):
+        """Set up parsers; tree-sitter is used when importable.
+
+        With *cache_dir*, parse results are kept in an SQLite database there,
+        keyed by (filename, language, sha256 of content), so unchanged files
+        are never reparsed across runs. Short snippets bypass it.
+        """
         self.use_tree_sitter = use_tree_sitter
         self._ts_parsers = {}
+        self._ts_queries = {}
+        self._cache: Optional[sqlite3.Connection] = None
+        self._cache_lock = threading.Lock()
+        # Same content parsed twice in one process (e.g. one file checked
+        # against several EIPs) is only parsed once.
+        self._parse_memo = lru_cache(maxsize=64)(self._parse_file)
 
         if use_tree_sitter:
             self._init_tree_sitter()
+        if cache_dir is not None:
+            self._init_cache(Path(cache_dir))
+
+    def _init_cache(self, cache_dir: Path):
+        """Open (or create) the persistent parse cache."""
+        cache_dir.mkdir(parents=True, exist_ok=True)
+        self._cache = sqlite3.connect(str(cache_dir / "ast_cache.sqlite"),
+                                      check_same_thread=False)
+        self._cache.execute("PRAGMA journal_mode=WAL")
+        self._cache.execute(
+            "CREATE TABLE IF NOT EXISTS ast ("
+            "path TEXT, lang TEXT, sha BLOB, blocks BLOB, "
+            "PRIMARY KEY (path, lang, sha))"
+        )
+        self._cache.commit()
 
     def _init_tree_sitter(self):
         """Initialize tree-sitter parsers (supports tree-sitter >= 0.22)."""
         try:
-            import tree_sitter_go
-            import tree_sitter_python
-            from tree_sitter import Language, Parser
-
-            # Modern tree-sitter API (>= 0.22): Language() takes a single arg
-            py_lang = Language(tree_sitter_python.language())
-            go_lang = Language(tree_sitter_go.language())
+            from tree_sitter import Parser
 
-            self._ts_parsers["python"] = Parser(py_lang)
-            self._ts_parsers["go"] = Parser(go_lang)
+            for language, (lang, query) in _ts_grammars().items():
+                self._ts_parsers[language] = Parser(lang)
+                self._ts_queries[language] = query
 
         except (ImportError, TypeError):
             # TypeError handles older tree-sitter API gracefully
@@ -65,100 +326,166 @@ class CodeParser:
     def parse_file(self, content: str, language: str,
                    filename: Optional[str] = None) -> List[CodeBlock]:
         """Parse source code and return a list of CodeBlock entries."""
-        language = language.lower()
+        return list(self._parse_memo(content, language.lower(), filename))
+
+    def _parse_file(self, content: str, language: str,
+                    filename: Optional[str]) -> List[CodeBlock]:
+        """parse_file without the in-memory memo: SQLite cache, then parse."""
+        if self._cache is None or content.count('\n') < _CACHE_MIN_LINES:
+            return self._parse(content, language)
+
+        # Rows are only valid for the parser that wrote them: the digest also
+        # covers the cache schema and the tree-sitter/regex backend
+        backend = b"ts" if self.use_tree_sitter and language in self._ts_parsers else b"re"
+        digest = hashlib.sha256(b"%s:%s:" % (_CACHE_SCHEMA, backend))
+        digest.update(content.encode("utf-8"))
+        key = (filename or "", language, digest.digest())
+        with self._cache_lock:
+            row = self._cache.execute(
+                "SELECT blocks FROM ast WHERE path=? AND lang=? AND sha=?", key
+            ).fetchone()
+        if row is not None:
+            try:
+                return _load_blocks(row[0])
+            except (TypeError, ValueError):
+                pass  # unreadable or foreign row; reparse
+
+        blocks = self._parse(content, language)
+        with self._cache_lock:
+            self._cache.execute("INSERT OR REPLACE INTO ast VALUES (?, ?, ?, ?)",
+                                (*key, _dump_blocks(blocks)))
+            self._cache.commit()
+        return blocks
 
+    def _parse(self, content: str, language: str) -> List[CodeBlock]:
+        """Dispatch to tree-sitter or the per-language regex parser."""
         if self.use_tree_sitter and language in self._ts_parsers:
             return self._parse_with_tree_sitter(content, language)
 
         # Fallback to regex parsing
-        if language == "go":
-            return self._parse_go(content)
-        elif language == "python":
-            return self._parse_python(content)
-        elif language in ("csharp", "c#", "cs"):
-            return self._parse_csharp(content)
-        elif language == "java":
-            return self._parse_java(content)
-        else:
+        parse = self._REGEX_PARSERS.get(language)
+        if parse is None:
             return self._parse_generic(content, language)
+        return parse(self, content)
 
     def _parse_go(self, content: str) -> List[CodeBlock]:
-        """Parse Go source code"""
-        blocks = []
-        lines = content.split('\n')
-
-        # Pattern for function definitions
-        # Return-type group handles: single word, pointer (*big.Int), tuple ((a, b)), or nothing.
-        func_pattern = re.compile(
-            r'^func\s+(?:\((\w+)\s+\*?(\w+)\)\s+)?(\w+)\s*\(([^)]*)\)\s*(?:\(([^)]*)\)|(\*?\w+(?:\.\w+)?))?(?:\s*)\{'
-        )
-
-        i = 0
-        while i < len(lines):
-            line = lines[i]
-            match = func_pattern.match(line.strip())
+        """Parse Go source code.
 
-            if match:
-                # Found function start
-                func_name = match.group(3)
-                receiver = match.group(2) if match.group(2) else None
-                start_line = i + 1
-
-                # Find matching closing brace
-                brace_count = line.count('{') - line.count('}')
-                end_line = i
-
-                while brace_count > 0 and end_line < len(lines) - 1:
-                    end_line += 1
-                    brace_count += lines[end_line].count('{')
-                    brace_count -= lines[end_line].count('}')
+        Works on the whole buffer: function headers are found with one
+        multiline regex and bodies are closed by walking only the brace
+        characters, never the lines in between.
+        """
+        blocks = []
+        newlines = [m.start() for m in _NEWLINE.finditer(content)]
+
+        pos = 0
+        while True:
+            match = _FUNC_GO.search(content, pos)
+            if match is None:
+                break
+
+            # Find matching closing brace (or EOF for a truncated body)
+            depth = 0
+            close = len(content)
+            for brace in _BRACES.finditer(content, match.end() - 1):
+                depth += 1 if brace.group() == '{' else -1
+                if depth == 0:
+                    close = brace.start()
+                    break
 
-                content_block = '\n'.join(lines[i:end_line + 1])
+            line_start = content.rfind('\n', 0, match.start()) + 1
+            header_end = content.find('\n', line_start)
+            line_end = content.find('\n', close)
+            if line_end == -1:
+                line_end = len(content)
+
+            receiver = match.group(2)
+            blocks.append(CodeBlock(
+                name=match.group(3),
+                type="method" if receiver else "function",
+                content=content[line_start:line_end],
+                start_line=bisect_left(newlines, line_start) + 1,
+                end_line=bisect_left(newlines, close) + 1,
+                language="go",
+                signature=content[line_start:header_end if header_end != -1 else None].strip()
+            ))
+
+            pos = line_end
 
-                blocks.append(CodeBlock(
-                    name=func_name,
-                    type="method" if receiver else "function",
-                    content=content_block,
-                    start_line=start_line,
-                    end_line=end_line + 1,
-                    language="go",
-                    signature=line.strip()
-                ))
+        return blocks
 
-                i = end_line
+    def _parse_python(self, content: str) -> List[CodeBlock]:
+        """Parse Python source code with the stdlib ast; partial files that
+        don't compile fall back to the line-based regex scan."""
+        try:
+            tree = ast.parse(content)
+        except (SyntaxError, ValueError):
+            return self._parse_python_regex(content)
 
-            i += 1
+        lines = content.split('\n')
+        blocks: List[CodeBlock] = []
+        defs = (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)
+
+        def visit(parent: ast.AST) -> None:
+            for node in ast.iter_child_nodes(parent):
+                if isinstance(node, defs):
+                    if isinstance(node, ast.ClassDef):
+                        kind = "class"
+                    elif isinstance(parent, ast.ClassDef):
+                        kind = "method"
+                    else:
+                        kind = "function"
+                    blocks.append(CodeBlock(
+                        name=node.name,
+                        type=kind,
+                        content='\n'.join(lines[node.lineno - 1:node.end_lineno]),
+                        start_line=node.lineno,
+                        end_line=node.end_lineno,
+                        language="python",
+                        signature=lines[node.lineno - 1].strip(),
+                        docstring=ast.get_docstring(node),
+                    ))
+                visit(node)
 
+        visit(tree)
         return blocks
 
-    def _parse_python(self, content: str) -> List[CodeBlock]:
-        """Parse Python source code"""
+    def _parse_python_regex(self, content: str) -> List[CodeBlock]:
+        """Line-based fallback for Python source that doesn't parse"""
         blocks = []
         lines = content.split('\n')
 
-        # Patterns
-        func_pattern = re.compile(r'^(\s*)def\s+(\w+)\s*\(([^)]*)\)\s*(?:->.*)?:')
-        class_pattern = re.compile(r'^(\s*)class\s+(\w+)\s*(?:\([^)]*\))?\s*:')
+        # Leading-space count per line (-1 for blank lines), computed once.
+        # A block at indent k can only end on a non-blank line indented
+        # <= k, so per indent level we keep just those line numbers and
+        # jump between them instead of re-walking every line of the body.
+        lead = [len(line) - len(line.lstrip(' ')) if line.strip() else -1 for line in lines]
+        shallow: Dict[int, List[int]] = {}
+
+        def block_end(start: int, indent: int, closes: Callable[[int], bool]) -> int:
+            if indent not in shallow:
+                shallow[indent] = [j for j, w in enumerate(lead) if 0 <= w <= indent]
+            candidates = shallow[indent]
+            for j in candidates[bisect_right(candidates, start):]:
+                if closes(j):
+                    return j
+            return len(lines) - 1
 
         i = 0
         while i < len(lines):
             line = lines[i]
 
             # Check for class definition
-            class_match = class_pattern.match(line)
+            class_match = _CLASS_PY.match(line)
             if class_match:
                 indent = len(class_match.group(1))
                 class_name = class_match.group(2)
                 start_line = i + 1
-                end_line = i
 
                 # Find end of class
-                while end_line < len(lines) - 1:
-                    end_line += 1
-                    next_line = lines[end_line]
-                    if next_line.strip() and not next_line.startswith(' ' * (indent + 1)):
-                        if not next_line.startswith(' ' * indent) or next_line.strip().startswith('class '):
-                            break
+                end_line = block_end(i, indent, lambda j, indent=indent: (
+                    lead[j] < indent or lines[j].lstrip().startswith('class ')
+                ))
 
                 content_block = '\n'.join(lines[i:end_line])
 
@@ -172,25 +499,21 @@ class CodeParser:
                     signature=line.strip()
                 ))
 
-                i = end_line - 1
-                i += 1
+                # A class on the last line has no body; step past it
+                i = max(end_line, i + 1)
                 continue
 
             # Check for function definition
-            func_match = func_pattern.match(line)
+            func_match = _FUNC_PY.match(line)
             if func_match:
                 indent = len(func_match.group(1))
                 func_name = func_match.group(2)
                 start_line = i + 1
-                end_line = i
 
                 # Find end of function
-                while end_line < len(lines) - 1:
-                    end_line += 1
-                    next_line = lines[end_line]
-                    if next_line.strip() and not next_line.startswith(' ' * (indent + 1)):
-                        if not next_line[indent:].startswith(' '):
-                            break
+                end_line = block_end(i, indent, lambda j, indent=indent: (
+                    not lines[j][indent:].startswith(' ')
+                ))
 
                 content_block = '\n'.join(lines[i:end_line])
 
@@ -337,27 +660,22 @@ class CodeParser:
 
     def _parse_csharp(self, content: str) -> List[CodeBlock]:
         """Parse C# source files."""
-        func_pat = re.compile(
-            r'(?:public|private|protected|internal|static|override|virtual|abstract|async|sealed|partial)\s+'
-            r'(?:[\w<>\[\],\s\?]+\s+)?(\w+)\s*(?:<[^>]+>)?\s*\([^)]*\)'
-        )
-        class_pat = re.compile(
-            r'(?:public|private|protected|internal|static|abstract|sealed|partial)\s+'
-            r'(?:class|struct|interface|record|enum)\s+(\w+)'
-        )
-        return self._parse_brace_language(content, "csharp", func_pat, class_pat)
+        return self._parse_brace_language(content, "csharp", _FUNC_CS, _CLASS_CS)
 
     def _parse_java(self, content: str) -> List[CodeBlock]:
         """Parse Java source files."""
-        func_pat = re.compile(
-            r'(?:public|private|protected|static|final|abstract|synchronized|native)\s+'
-            r'(?:[\w<>\[\],\s\?]+\s+)?(\w+)\s*\([^)]*\)'
-        )
-        class_pat = re.compile(
-            r'(?:public|private|protected|static|final|abstract)\s+'
-            r'(?:class|interface|enum|record)\s+(\w+)'
-        )
-        return self._parse_brace_language(content, "java", func_pat, class_pat)
+        return self._parse_brace_language(content, "java", _FUNC_JAVA, _CLASS_JAVA)
+
+    # Regex parser per (lowercased) language name or alias; one dict lookup
+    # in _parse() instead of an if/elif chain
+    _REGEX_PARSERS: Dict[str, Callable[["CodeParser", str], List[CodeBlock]]] = {
+        "go": _parse_go,
+        "python": _parse_python,
+        "csharp": _parse_csharp,
+        "c#": _parse_csharp,
+        "cs": _parse_csharp,
+        "java": _parse_java,
+    }
 
     def _parse_generic(self, content: str, language: str) -> List[CodeBlock]:
         """Generic parsing for unsupported languages"""
@@ -366,51 +684,50 @@ class CodeParser:
             type="file",
             content=content,
             start_line=1,
-            end_line=len(content.split('\n')),
+            end_line=content.count('\n') + 1,
             language=language
         )]
 
     def _parse_with_tree_sitter(self, content: str, language: str) -> List[CodeBlock]:
-        """Parse using tree-sitter for more accurate results"""
-        parser = self._ts_parsers.get(language)
-        if not parser:
-            return self._parse_generic(content, language)
+        """Parse using tree-sitter for more accurate results.
 
-        tree = parser.parse(bytes(content, "utf8"))
-        blocks = []
-
-        # Language-specific node types
-        if language == "go":
-            func_types = ["function_declaration", "method_declaration"]
-        elif language == "python":
-            func_types = ["function_definition", "class_definition"]
-        else:
+        Definitions are matched by a precompiled query in one C-side pass;
+        only the captured nodes cross into Python.
+        """
+        parser = self._ts_parsers.get(language)
+        query = self._ts_queries.get(language)
+        if not parser or not query:
             return self._parse_generic(content, language)
 
-        def traverse(node):
-            if node.type in func_types:
-                # Extract name
-                name = None
-                for child in node.children:
-                    if child.type == "identifier" or child.type == "name":
-                        name = content[child.start_byte:child.end_byte]
-                        break
-
-                if name:
-                    blocks.append(CodeBlock(
-                        name=name,
-                        type="function" if "function" in node.type else "class",
-                        content=content[node.start_byte:node.end_byte],
-                        start_line=node.start_point[0] + 1,
-                        end_line=node.end_point[0] + 1,
-                        language=language
-                    ))
-
-            for child in node.children:
-                traverse(child)
-
-        traverse(tree.root_node)
-        return blocks
+        # tree-sitter offsets are UTF-8 byte offsets: slice the encoded buffer
+        # through a memoryview and decode each span straight from it.
+        source = content.encode("utf-8")
+        view = memoryview(source)
+        tree = parser.parse(source)
+
+        # A method also matches the plain function pattern; keyed by start
+        # byte, the more specific "method" capture wins.
+        found: Dict[int, CodeBlock] = {}
+        for _, captures in _query_matches(query, tree.root_node):
+            name_node = captures["name"]
+            kind = next(k for k in captures if k != "name")
+            node = captures[kind]
+            if isinstance(name_node, list):
+                name_node, node = name_node[0], node[0]
+            if node.start_byte in found and kind != "method":
+                continue
+            text = str(view[node.start_byte:node.end_byte], "utf-8")
+            found[node.start_byte] = CodeBlock(
+                name=str(view[name_node.start_byte:name_node.end_byte], "utf-8"),
+                type=kind,
+                content=text,
+                start_line=node.start_point[0] + 1,
+                end_line=node.end_point[0] + 1,
+                language=language,
+                signature=text.split('\n', 1)[0].strip(),
+            )
+
+        return [found[start] for start in sorted(found)]
 
     def find_function(self, content: str, function_name: str,
                       language: str) -> Optional[CodeBlock]:
@@ -424,22 +741,22 @@ class CodeParser:
         return None
 
     def find_eip1559_functions(self, content: str, language: str) -> List[CodeBlock]:
-        """Find EIP-1559 related functions. Delegates to find_eip_functions."""
-        return self.find_eip_functions(content, language, 1559)
+        """Find EIP-1559 related functions. Delegates to find_eips."""
+        return self.find_eips(content, language, [1559])[1559]
 
     def find_eip4844_functions(self, content: str, language: str) -> List[CodeBlock]:
-        """Find EIP-4844 related functions. Delegates to find_eip_functions."""
-        return self.find_eip_functions(content, language, 4844)
+        """Find EIP-4844 related functions. Delegates to find_eips."""
+        return self.find_eips(content, language, [4844])[4844]
 
     # Per-EIP keyword sets for find_eip_functions.
-    EIP_KEYWORDS: Dict[int, List[str]] = {
-        1559: [
+    EIP_KEYWORDS: Dict[int, Tuple[str, ...]] = {
+        1559: (
             "basefee", "base_fee", "gaslimit", "gas_limit",
             "feecap", "fee_cap", "tiplimit", "priority",
             "1559", "dynamicfee", "dynamic_fee",
             "calcbasefee", "calc_base_fee", "verifyeip1559",
-        ],
-        4844: [
+        ),
+        4844: (
             "blob", "4844", "kzg", "shard",
             "blob_gas", "blobgas", "excess_blob_gas", "excessblobgas",
             "blob_fee", "blobfee", "blobhash", "blob_hash",
@@ -448,85 +765,164 @@ class CodeParser:
             "validate_blob", "fakeblobsidecar", "calcexcessblobgas",
             "calc_excess_blob_gas", "blobbasefee", "blob_base_fee",
             "point_evaluation", "pointevaluation",
-        ],
-        4788: [
+        ),
+        4788: (
             "4788", "beacon_root", "beaconroot",
             "parent_beacon_block_root", "parentbeaconblockroot",
-        ],
-        2930: [
+        ),
+        2930: (
             "2930", "access_list", "accesslist",
             "accesslisttx", "access_list_tx",
-        ],
-        7002: [
+        ),
+        7002: (
             "7002", "withdrawal_request", "withdrawalrequest",
             "execution_layer_exit", "executionlayerexit",
-        ],
-        7251: [
+        ),
+        7251: (
             "7251", "max_effective_balance", "maxeffectivebalance",
             "consolidation",
-        ],
+        ),
     }
 
     def find_eip_functions(self, content: str, language: str,
                            eip_number: int) -> List[CodeBlock]:
         """Return all code blocks whose name or body matches registered keywords
         for the given EIP.  Falls back to the bare EIP number string."""
-        blocks = self.parse_file(content, language)
-
-        keywords = self.EIP_KEYWORDS.get(eip_number, [str(eip_number)])
-
-        relevant: List[CodeBlock] = []
-        for block in blocks:
-            name_lower = block.name.lower()
-            content_lower = block.content.lower()
-
-            for keyword in keywords:
-                if keyword in name_lower or keyword in content_lower:
-                    relevant.append(block)
-                    break
+        return list(self.iter_eip_functions(content, language, eip_number))
+
+    def iter_eip_functions(self, content: str, language: str,
+                           eip_number: int) -> Iterator[CodeBlock]:
+        """Lazily yield what find_eip_functions returns, in source order.
+
+        Blocks are keyword-scanned only as they are consumed, so a caller
+        that stops early (e.g. via itertools.islice) skips the rest.
+        """
+        route = self._eip_route((eip_number,))
+        if not route("", content):
+            return
+        for block in self.parse_file(content, language):
+            if route(block.name, block.content):
+                yield block
+
+    def _eip_route(self, eips: Tuple[int, ...]) -> Callable[[str, str], Iterable[int]]:
+        """Matcher reporting which of *eips* have a keyword in (name, body).
+
+        Uses the Hyperscan database when installed, the regex router otherwise.
+        """
+        keyword_sets = tuple(
+            (eip, tuple(self.EIP_KEYWORDS.get(eip, (str(eip),)))) for eip in eips
+        )
+        if not HYPERSCAN_AVAILABLE:
+            return _eip_router(keyword_sets)
+        db, ids = _hyperscan_db(keyword_sets)
+
+        def route(name: str, content: str) -> Iterable[int]:
+            return _hyperscan_hits(db, ids, (name.encode(), content.encode()), len(eips))
+        return route
+
+    def find_eips(self, content: str, language: str,
+                  eip_numbers: Iterable[int]) -> Dict[int, List[CodeBlock]]:
+        """Route every block to each requested EIP it mentions.
+
+        The file is parsed once and each block is scanned once for all
+        EIPs together, instead of once per EIP; with ``hyperscan``
+        installed the scan runs on its automaton instead of ``re``. Every
+        block name and body is a slice of *content*, so a file mentioning
+        none of the keywords is answered from one scan without parsing.
+        """
+        eips = tuple(dict.fromkeys(eip_numbers))
+        found: Dict[int, List[CodeBlock]] = {eip: [] for eip in eips}
+        if not eips:
+            return found
+
+        route = self._eip_route(eips)
+        if not route("", content):
+            return found
+        for block in self.parse_file(content, language):
+            for eip in route(block.name, block.content):
+                found[eip].append(block)
+        return found
+
+    def scan_repo(self, paths: Iterable[Union[str, Path]],
+                  eip_numbers: Optional[Iterable[int]] = None) -> Dict[Path, Set[int]]:
+        """Report which EIPs' keywords occur anywhere in each file.
+
+        A cheap pre-filter for large trees: files come back with an empty
+        set when no registered keyword matches, so only the rest need
+        parsing. With the optional ``hyperscan`` package all keywords are
+        matched in a single SIMD pass per file; otherwise the combined
+        regex router from find_eips is used.
+        """
+        eips = tuple(dict.fromkeys(eip_numbers if eip_numbers is not None else self.EIP_KEYWORDS))
+        keyword_sets = tuple(
+            (eip, tuple(self.EIP_KEYWORDS.get(eip, (str(eip),)))) for eip in eips
+        )
 
-        return relevant
+        found: Dict[Path, Set[int]] = {}
+        if not eips:
+            return {Path(path): set() for path in paths}
+        if HYPERSCAN_AVAILABLE:
+            db, ids = _hyperscan_db(keyword_sets)
+            for path in map(Path, paths):
+                found[path] = _hyperscan_hits(db, ids, (path.read_bytes(),), len(eips))
+        else:
+            router = _eip_router(keyword_sets)
+            for path in map(Path, paths):
+                text = path.read_text(encoding="utf-8", errors="replace")
+                found[path] = set(router("", text))
+        return found
 
     def extract_comments(self, content: str, language: str) -> List[Dict[str, Any]]:
-        """Pull out single-line comments, multi-line comments, and docstrings."""
-        comments = []
+        """Pull out single-line comments, multi-line comments, and docstrings.
 
+        One forward scan over the source, in order of appearance; each entry
+        carries the line it starts on.
+        """
         if language == "go":
-            # Single line comments
-            for i, line in enumerate(content.split('\n')):
-                if '//' in line:
-                    comment_start = line.index('//')
-                    comments.append({
-                        "line": i + 1,
-                        "type": "single",
-                        "content": line[comment_start + 2:].strip()
-                    })
-
-            # Multi-line comments
-            pattern = re.compile(r'/\*.*?\*/', re.DOTALL)
-            for match in pattern.finditer(content):
+            openers, closers = _GO_OPENERS, {"/*": ("*/", "multi"), "`": ("`", None)}
+        elif language == "python":
+            openers, closers = _PY_OPENERS, {'"""': ('"""', "docstring"),
+                                             "'''": ("'''", "docstring")}
+        else:
+            return []
+
+        comments: List[Dict[str, Any]] = []
+        pos = 0
+        # Line numbers are rolled forward from the previous comment rather
+        # than looked up in a newline index built over the whole file.
+        line, counted = 1, 0
+        while True:
+            match = openers.search(content, pos)
+            if match is None:
+                break
+            token, start = match.group(), match.start()
+
+            if token in ("//", "#"):
+                end = content.find('\n', start)
+                end = len(content) if end == -1 else end
+                line += content.count('\n', counted, start)
+                counted = start
                 comments.append({
-                    "type": "multi",
-                    "content": match.group()[2:-2].strip()
+                    "line": line,
+                    "type": "single",
+                    "content": content[start + len(token):end].strip(),
                 })
-
-        elif language == "python":
-            # Single line comments
-            for i, line in enumerate(content.split('\n')):
-                stripped = line.strip()
-                if stripped.startswith('#'):
+                pos = end
+            elif token in closers:
+                closer, kind = closers[token]
+                end = content.find(closer, match.end())
+                if end == -1:
+                    break  # unterminated: the rest of the file is inside it
+                if kind:
+                    line += content.count('\n', counted, start)
+                    counted = start
                     comments.append({
-                        "line": i + 1,
-                        "type": "single",
-                        "content": stripped[1:].strip()
+                        "line": line,
+                        "type": kind,
+                        "content": content[match.end():end].strip(),
                     })
-
-            # Docstrings
-            pattern = re.compile(r'""".*?"""|\'\'\'.*?\'\'\'', re.DOTALL)
-            for match in pattern.finditer(content):
-                comments.append({
-                    "type": "docstring",
-                    "content": match.group()[3:-3].strip()
-                })
+                pos = end + len(closer)
+            else:
+                pos = _QUOTED_TAIL[token].match(content, match.end()).end()
 
         return comments
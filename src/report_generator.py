@@ -7,6 +7,12 @@ from datetime import datetime
 from pathlib import Path
 from typing import Any, Dict, List
 
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
 try:
     from rich import box
     from rich.console import Console
@@ -78,8 +84,13 @@ class ReportGenerator:
         filename = f"prspec_eip{metadata.eip_number}_{metadata.client}_{metadata.timestamp.strftime('%Y%m%d_%H%M%S')}.json"
         filepath = self.output_dir / filename
 
-        with open(filepath, 'w') as f:
-            json.dump(report, f, indent=2)
+        if ORJSON_AVAILABLE:
+            filepath.write_bytes(
+                orjson.dumps(report, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS)
+            )
+        else:
+            with open(filepath, 'w') as f:
+                json.dump(report, f, indent=2)
 
         return str(filepath)
 
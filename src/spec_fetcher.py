@@ -1,9 +1,77 @@
 """Fetches Ethereum EIP specs, execution specs, and consensus specs from GitHub."""
 
+import hashlib
+import json
+import re
+import shutil
+import sqlite3
+import threading
+import time
+import weakref
+from concurrent.futures import Future, ThreadPoolExecutor
+from functools import cache, lru_cache, partialmethod
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 
 import requests
+from requests.adapters import HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+from urllib3.util.retry import Retry
+
+from . import __version__
+
+try:
+    import h2  # noqa: F401  (httpx's HTTP/2 backend)
+    import httpx
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+_SECTION_HEADER = re.compile(r'^## (.*)$', re.MULTILINE)
+_BASE_FEE = re.compile(r'base ?fee', re.IGNORECASE)
+_BLANK_LINE = re.compile(r'^[^\S\n]*$', re.MULTILINE)
+
+# Cache database inside cache_dir; everything else there is legacy and
+# swept by clear_cache().
+_STORE_NAME = "specs.sqlite"
+# cache_dir sentinel for a store that never touches disk (sqlite's own name)
+_MEMORY = ":memory:"
+
+# ethereum/<repo> spec repositories: default branch and cache-key prefix
+_SPEC_REPOS = {
+    "execution-specs": ("master", "exec_spec_"),
+    "consensus-specs": ("dev", "consensus_spec_"),
+}
+_GRAPHQL_URL = "https://api.github.com/graphql"
+# Seconds to wait for GitHub to connect / send the next chunk
+_TIMEOUT = 30
+
+# Keep-alive pool shared by every SpecFetcher (and the parallel
+# fetch_eip_spec workers), so new instances reuse open TLS connections.
+# GETs are retried on rate limiting (honouring Retry-After) and 5xx; when
+# the retries run out the last response is returned, so callers see an
+# HTTPError from raise_for_status() rather than a RetryError.
+# Headers, including the token, stay on each instance's own Session.
+_ADAPTER = HTTPAdapter(
+    pool_connections=16,
+    pool_maxsize=32,
+    max_retries=Retry(
+        total=3,
+        backoff_factor=0.3,
+        status_forcelist=[429, 500, 502, 503, 504],
+        allowed_methods=frozenset(["GET"]),
+        raise_on_status=False,
+    ),
+)
+
+
+@lru_cache(maxsize=None)
+def _spec_key(repo: str, path: str) -> str:
+    """Cache key of *path* in ethereum/*repo* (also its list_cached_specs name).
+
+    Memoized: the registry's handful of paths are mapped once per process.
+    """
+    return _SPEC_REPOS[repo][1] + path.replace('/', '_')
 
 
 class SpecFetcher:
@@ -62,24 +130,77 @@ class SpecFetcher:
         },
     }
 
-    def __init__(self, github_token: Optional[str] = None, cache_dir: Optional[str] = None):
-        """Set up HTTP session and local cache directory."""
+    def __init__(self, github_token: Optional[str] = None, cache_dir: Optional[str] = None,
+                 cache_ttl_seconds: Optional[int] = 86400, use_http2: bool = False,
+                 prefetch: bool = False):
+        """Set up HTTP session and local cache directory.
+
+        *cache_ttl_seconds* is how long a cached spec is served without
+        asking GitHub; older entries are revalidated with a conditional GET
+        (None keeps them forever).
+        *use_http2* multiplexes the spec downloads of fetch_eip_spec over one
+        HTTP/2 connection via httpx (``pip install 'httpx[http2]'``).
+        *prefetch* starts warming the cache for every supported EIP in the
+        background; see wait_prefetch().
+        A *cache_dir* of ``":memory:"`` keeps the store in an in-memory
+        SQLite database that lives as long as the fetcher (``cache_dir``
+        is then None); nothing touches the filesystem.
+        """
         self.github_token = github_token
-        self.cache_dir = Path(cache_dir) if cache_dir else Path.cwd() / ".spec_cache"
+        self.cache_ttl_seconds = cache_ttl_seconds
+        if cache_dir == _MEMORY:
+            self.cache_dir: Optional[Path] = None
+        else:
+            self.cache_dir = Path(cache_dir) if cache_dir else Path.cwd() / ".spec_cache"
         self.session = requests.Session()
+        self.session.mount("https://", _ADAPTER)
+        self.session.headers["User-Agent"] = f"PRSpec/{__version__}"
+        # Section dicts keyed by (eip_number, markdown); see _sections_for()
+        self._sections_memo = lru_cache(maxsize=64)(self._load_sections)
+        # Decoded text of fresh specs by cache key, with their fetched_at, so
+        # repeat fetches in one process skip the SQLite read and decode
+        self._texts: Dict[str, Tuple[float, str]] = {}
+        self._inflight: Dict[Tuple[str, bool, bool], Future] = {}
+        self._inflight_lock = threading.Lock()
 
         if github_token:
             self.session.headers["Authorization"] = f"token {github_token}"
 
-        # Create cache directory
-        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self._h2_client = None
+        if use_http2:
+            if not HTTP2_AVAILABLE:
+                raise RuntimeError("httpx[http2] not installed. Install with: pip install 'httpx[http2]'")
+            self._h2_client = httpx.Client(
+                headers=dict(self.session.headers),
+                timeout=_TIMEOUT,
+                transport=httpx.HTTPTransport(
+                    http2=True,
+                    retries=3,
+                    limits=httpx.Limits(max_keepalive_connections=4, max_connections=16),
+                ),
+            )
+            # Release the HTTP/2 connection when the fetcher is collected
+            weakref.finalize(self, self._h2_client.close)
+
+        if self.cache_dir is not None:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self._store_lock = threading.Lock()
+        self._store = self._open_store()
+
+        self._prefetch: List[Future] = []
+        if prefetch:
+            executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="spec-prefetch")
+            self._prefetch = [executor.submit(self.fetch_eip_spec, n)
+                              for n in self.supported_eips()]
+            executor.shutdown(wait=False)
 
     # ---- Supported EIP helpers ----
 
     @classmethod
-    def supported_eips(cls) -> List[int]:
-        """Return a sorted list of EIP numbers with full support."""
-        return sorted(cls.EIP_REGISTRY.keys())
+    @cache
+    def supported_eips(cls) -> Tuple[int, ...]:
+        """Return the EIP numbers with full support, sorted (computed once)."""
+        return tuple(sorted(cls.EIP_REGISTRY))
 
     @classmethod
     def get_eip_title(cls, eip_number: int) -> str:
@@ -89,136 +210,347 @@ class SpecFetcher:
             return info["title"]
         return f"EIP-{eip_number}"
 
-    # ---- Core fetchers ----
+    # ---- Spec store ----
+
+    # One SQLite row per cached spec (body + validators + fetch time), keyed
+    # by the name list_cached_specs() reports; WAL keeps readers unblocked.
+
+    def _open_store(self) -> sqlite3.Connection:
+        """Open (or create) the cache database."""
+        target = _MEMORY if self.cache_dir is None else str(self.cache_dir / _STORE_NAME)
+        store = sqlite3.connect(target, check_same_thread=False, isolation_level=None)
+        store.execute("PRAGMA journal_mode=WAL")
+        store.execute("PRAGMA synchronous=NORMAL")
+        store.execute(
+            "CREATE TABLE IF NOT EXISTS spec ("
+            "key TEXT PRIMARY KEY, body BLOB, etag TEXT, last_modified TEXT, fetched_at REAL)"
+        )
+        store.execute(
+            "CREATE TABLE IF NOT EXISTS sections ("
+            "eip INTEGER PRIMARY KEY, sha TEXT, sections TEXT)"
+        )
+        return store
+
+    def _query(self, sql: str, params: Tuple = ()) -> List[Tuple[Any, ...]]:
+        """Run one statement on the store; the connection is shared by workers."""
+        with self._store_lock:
+            return self._store.execute(sql, params).fetchall()
+
+    def _write_spec(self, key: str, body: bytes, etag: Optional[str] = None,
+                    last_modified: Optional[str] = None) -> None:
+        """Insert or replace the cached body and validators for *key*."""
+        self._texts.pop(key, None)
+        self._query("INSERT OR REPLACE INTO spec VALUES (?, ?, ?, ?, ?)",
+                    (key, body, etag, last_modified, time.time()))
+
+    def _is_fresh(self, fetched_at: float) -> bool:
+        """True if a row fetched (or revalidated) at *fetched_at* is within the TTL."""
+        return self.cache_ttl_seconds is None or time.time() - fetched_at < self.cache_ttl_seconds
+
+    def _get(self, url: str, headers: Dict[str, str]) -> requests.Response:
+        """Streamed GET; over HTTP/2 the httpx reply is wrapped as a requests.Response."""
+        if self._h2_client is None:
+            return self.session.get(url, headers=headers, stream=True, timeout=_TIMEOUT)
+
+        try:
+            reply = self._h2_client.get(url, headers=headers)
+        except httpx.TimeoutException as e:
+            raise requests.Timeout(str(e)) from e
+        except httpx.TransportError as e:
+            # Offline / refused / reset: same type the requests path raises
+            raise requests.ConnectionError(str(e)) from e
+        response = requests.Response()
+        response.status_code = reply.status_code
+        response.reason = reply.reason_phrase
+        response.headers = CaseInsensitiveDict(reply.headers)
+        response.url = url
+        response._content = reply.content
+        response._content_consumed = True
+        return response
+
+    def _fetch_cached(self, url: str, key: str, use_cache: bool = True,
+                      revalidate: bool = False) -> str:
+        """GET *url* through the cache row *key*.
+
+        A fresh cached copy is returned without touching the network unless
+        *revalidate* is set; a stale, bypassed or revalidated one is checked
+        with a conditional GET, and a 304 serves the cached body and resets
+        its TTL.
+        """
+        if use_cache and not revalidate:
+            memo = self._texts.get(key)
+            if memo and self._is_fresh(memo[0]):
+                return memo[1]
+
+        # Concurrent callers for the same spec (e.g. analyzer threads) share
+        # one lookup/download instead of racing each other to GitHub. Only
+        # callers with the same cache mode share, so a bypass or revalidate
+        # never gets handed a plain cached read's (possibly stale) body.
+        flight = (key, use_cache, revalidate)
+        with self._inflight_lock:
+            pending = self._inflight.get(flight)
+            if pending is None:
+                pending = self._inflight[flight] = Future()
+                owner = True
+            else:
+                owner = False
+        if not owner:
+            return pending.result()
+
+        try:
+            text = self._load(url, key, use_cache, revalidate)
+        except BaseException as exc:
+            pending.set_exception(exc)
+            raise
+        else:
+            pending.set_result(text)
+            return text
+        finally:
+            with self._inflight_lock:
+                del self._inflight[flight]
+
+    def _load(self, url: str, key: str, use_cache: bool, revalidate: bool) -> str:
+        """The store lookup and conditional GET behind _fetch_cached()."""
+        rows = self._query(
+            "SELECT body, etag, last_modified, fetched_at FROM spec WHERE key=?", (key,)
+        )
+        cached = rows[0] if rows else None
+        if cached and use_cache and not revalidate and self._is_fresh(cached[3]):
+            text = cached[0].decode("utf-8", "replace")
+            self._texts[key] = (cached[3], text)
+            return text
+
+        headers = {}
+        if cached and cached[1]:
+            headers["If-None-Match"] = cached[1]
+        if cached and cached[2]:
+            headers["If-Modified-Since"] = cached[2]
+
+        response = self._get(url, headers)
+        try:
+            if response.status_code == 304 and cached:
+                now = time.time()
+                self._query("UPDATE spec SET fetched_at=? WHERE key=?", (now, key))
+                text = cached[0].decode("utf-8", "replace")
+                self._texts[key] = (now, text)
+                return text
+            response.raise_for_status()
+            body = b"".join(response.iter_content(chunk_size=65536))
+        finally:
+            response.close()
+
+        self._write_spec(key, body, response.headers.get("ETag"),
+                         response.headers.get("Last-Modified"))
+        return body.decode("utf-8", "replace")
 
-    def fetch_eip(self, eip_number: int, use_cache: bool = True) -> str:
-        """Fetch the raw EIP markdown. Works for any EIP number."""
-        cache_file = self.cache_dir / f"eip-{eip_number}.md"
+    # ---- Core fetchers ----
 
-        # Check cache
-        if use_cache and cache_file.exists():
-            return cache_file.read_text()
+    # Every fetcher takes *revalidate* to force a conditional GET even when
+    # the cached copy is within its TTL; an unchanged spec costs a 304.
 
-        # Fetch from GitHub
+    def fetch_eip(self, eip_number: int, use_cache: bool = True,
+                  revalidate: bool = False) -> str:
+        """Fetch the raw EIP markdown. Works for any EIP number."""
         url = f"https://raw.githubusercontent.com/ethereum/EIPs/master/EIPS/eip-{eip_number}.md"
-        response = self.session.get(url)
-        response.raise_for_status()
-
-        content = response.text
-
-        # Cache the result
-        cache_file.write_text(content)
-
-        return content
+        return self._fetch_cached(url, f"eip-{eip_number}.md", use_cache, revalidate)
 
     def fetch_execution_spec(self, file_path: str, branch: str = "master",
-                             use_cache: bool = True) -> str:
+                             use_cache: bool = True, revalidate: bool = False) -> str:
         """Fetch a Python file from ethereum/execution-specs."""
-        cache_file = self.cache_dir / f"exec_spec_{file_path.replace('/', '_')}"
-
-        if use_cache and cache_file.exists():
-            return cache_file.read_text()
-
+        key = _spec_key("execution-specs", file_path)
         url = f"https://raw.githubusercontent.com/ethereum/execution-specs/{branch}/{file_path}"
-        response = self.session.get(url)
-        response.raise_for_status()
-
-        content = response.text
-        cache_file.write_text(content)
-
-        return content
+        return self._fetch_cached(url, key, use_cache, revalidate)
 
     def fetch_consensus_spec(self, file_path: str, branch: str = "dev",
-                             use_cache: bool = True) -> str:
+                             use_cache: bool = True, revalidate: bool = False) -> str:
         """Fetch a file from ethereum/consensus-specs."""
-        cache_file = self.cache_dir / f"consensus_spec_{file_path.replace('/', '_')}"
-
-        if use_cache and cache_file.exists():
-            return cache_file.read_text()
-
+        key = _spec_key("consensus-specs", file_path)
         url = f"https://raw.githubusercontent.com/ethereum/consensus-specs/{branch}/{file_path}"
-        response = self.session.get(url)
-        response.raise_for_status()
+        return self._fetch_cached(url, key, use_cache, revalidate)
 
-        content = response.text
-        cache_file.write_text(content)
+    def _stale_paths(self, repo: str, paths: List[str]) -> List[str]:
+        """The subset of *paths* with no fresh cached copy."""
+        if not paths:
+            return []
+        keys = {_spec_key(repo, path): path for path in paths}
+        rows = self._query(
+            f"SELECT key, fetched_at FROM spec WHERE key IN ({', '.join('?' * len(keys))})",
+            tuple(keys),
+        )
+        fresh = {key for key, fetched_at in rows if self._is_fresh(fetched_at)}
+        return [path for key, path in keys.items() if key not in fresh]
+
+    def fetch_paths_bulk(self, repo: str, paths: List[str],
+                         branch: Optional[str] = None) -> Dict[str, str]:
+        """Fetch several files from ethereum/*repo* in one GraphQL round trip.
+
+        *repo* is "execution-specs" or "consensus-specs". Each file is
+        written to the cache under the same key its single-file fetcher
+        uses. Blobs GitHub returns truncated (or without text) are fetched
+        raw instead. Paths that don't exist are left out of the result.
+        GraphQL needs credentials, so without a token this falls back to one
+        raw fetch per path.
+        """
+        branch = branch or _SPEC_REPOS[repo][0]
+        fetch = (self.fetch_execution_spec if repo == "execution-specs"
+                 else self.fetch_consensus_spec)
+
+        if not self.github_token:
+            found = {}
+            for path in paths:
+                try:
+                    found[path] = fetch(path, branch=branch)
+                except requests.HTTPError:
+                    continue
+            return found
+
+        fields = " ".join(
+            f"f{i}: object(expression: {json.dumps(f'{branch}:{path}')}) {{ ... on Blob {{ text isTruncated }} }}"
+            for i, path in enumerate(paths)
+        )
+        response = self.session.post(_GRAPHQL_URL, timeout=_TIMEOUT, json={
+            "query": "query($owner: String!, $name: String!) "
+                     f"{{ repository(owner: $owner, name: $name) {{ {fields} }} }}",
+            "variables": {"owner": "ethereum", "name": repo},
+        })
+        response.raise_for_status()
+        repository = (response.json().get("data") or {}).get("repository") or {}
 
-        return content
+        found = {}
+        for i, path in enumerate(paths):
+            blob = repository.get(f"f{i}")
+            if not blob:
+                continue
+            if blob.get("text") is None or blob.get("isTruncated"):
+                # Large specs come back cut short; never cache a partial file
+                try:
+                    found[path] = fetch(path, branch=branch)
+                except requests.HTTPError:
+                    pass
+                continue
+            self._write_spec(_spec_key(repo, path), blob["text"].encode("utf-8"))
+            found[path] = blob["text"]
+        return found
 
     # ---- Generic EIP spec fetcher ----
 
-    def fetch_eip_spec(self, eip_number: int) -> Dict[str, str]:
+    def fetch_eip_spec(self, eip_number: int, revalidate: bool = False) -> Dict[str, str]:
         """Fetch EIP markdown + any execution/consensus specs for this EIP."""
         info = self.EIP_REGISTRY.get(eip_number, {})
         title = info.get("title", f"EIP-{eip_number}")
 
+        exec_paths = info.get("execution_spec_paths", [])
+        consensus_paths = info.get("consensus_spec_paths", [])
+
+        # With a token, every spec file not already fresh in the cache is
+        # pulled in one GraphQL request per repo; the per-path fetches
+        # below then hit the cache. Any failure just leaves them to GitHub raw.
+        if self.github_token and not revalidate:
+            for repo, paths in (("execution-specs", exec_paths),
+                                ("consensus-specs", consensus_paths)):
+                stale = self._stale_paths(repo, paths)
+                if stale:
+                    try:
+                        self.fetch_paths_bulk(repo, stale)
+                    except (requests.RequestException, ValueError):
+                        pass
+
+        # All paths go out at once; the pooled session reuses connections
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            markdown = pool.submit(self.fetch_eip, eip_number, revalidate=revalidate)
+            exec_futures = [pool.submit(self.fetch_execution_spec, p, revalidate=revalidate)
+                            for p in exec_paths]
+            consensus_futures = [pool.submit(self.fetch_consensus_spec, p, revalidate=revalidate)
+                                 for p in consensus_paths]
+
         result: Dict[str, Optional[str]] = {
-            "eip_markdown": self.fetch_eip(eip_number),
+            "eip_markdown": markdown.result(),
             "execution_spec": None,
             "consensus_spec": None,
             "title": title,
         }
 
-        # Try execution spec paths in order; first success wins
-        for path in info.get("execution_spec_paths", []):
+        # Execution spec paths are in preference order; first success wins
+        for future in exec_futures:
             try:
-                result["execution_spec"] = self.fetch_execution_spec(path)
+                result["execution_spec"] = future.result()
                 break
-            except (requests.HTTPError, requests.ConnectionError):
+            except requests.RequestException:
                 continue
 
-        # Try consensus spec paths; concatenate all that succeed
+        # Concatenate all consensus spec files that succeed
         consensus_parts: List[str] = []
-        for path in info.get("consensus_spec_paths", []):
+        for future in consensus_futures:
             try:
-                consensus_parts.append(self.fetch_consensus_spec(path))
-            except (requests.HTTPError, requests.ConnectionError):
+                consensus_parts.append(future.result())
+            except requests.RequestException:
                 continue
         if consensus_parts:
             result["consensus_spec"] = "\n\n---\n\n".join(consensus_parts)
 
         return result
 
-    # ---- Legacy convenience methods ----
+    def wait_prefetch(self) -> Dict[int, Optional[BaseException]]:
+        """Block until a *prefetch* started in __init__ is done.
 
-    def fetch_eip1559_spec(self) -> Dict[str, str]:
-        """Shortcut for fetch_eip_spec(1559)."""
-        return self.fetch_eip_spec(1559)
+        Returns each supported EIP mapped to the error its prefetch hit, or
+        None on success; failed EIPs are simply fetched again on demand.
+        """
+        return {
+            eip: future.exception()
+            for eip, future in zip(self.supported_eips(), self._prefetch)
+        }
 
-    def fetch_eip4844_spec(self) -> Dict[str, str]:
-        """Shortcut for fetch_eip_spec(4844)."""
-        return self.fetch_eip_spec(4844)
+    # ---- Legacy convenience methods ----
+
+    # Bound straight to fetch_eip_spec (no wrapper frame); they accept the
+    # same keyword arguments, e.g. fetch_eip1559_spec(revalidate=True).
+    fetch_eip1559_spec = partialmethod(fetch_eip_spec, 1559)
+    fetch_eip4844_spec = partialmethod(fetch_eip_spec, 4844)
 
     # ---- Section extraction ----
 
     def extract_eip_sections(self, eip_content: str) -> Dict[str, str]:
         """Split an EIP markdown into its ## sections."""
+        headers = list(_SECTION_HEADER.finditer(eip_content))
+        if not headers:
+            return {"header": eip_content}
+
         sections = {}
-        current_section = "header"
-        current_content: List[str] = []
-
-        for line in eip_content.split('\n'):
-            if line.startswith('## '):
-                # Save previous section
-                if current_content:
-                    sections[current_section] = '\n'.join(current_content)
-
-                # Start new section
-                current_section = line[3:].strip().lower().replace(' ', '_')
-                current_content = []
-            else:
-                current_content.append(line)
+        # A section's body runs from the line after its heading up to (not
+        # including) the newline before the next heading; a heading directly
+        # followed by another heading or EOF has no lines and is skipped.
+        if headers[0].start() > 0:
+            sections["header"] = eip_content[:headers[0].start() - 1]
+        ends = [m.start() - 1 for m in headers[1:]] + [len(eip_content)]
+        for match, end in zip(headers, ends):
+            start = match.end() + 1
+            if start <= end:
+                name = match.group(1).strip().lower().replace(' ', '_')
+                sections[name] = eip_content[start:end]
 
-        # Save last section
-        if current_content:
-            sections[current_section] = '\n'.join(current_content)
+        return sections
+
+    def _load_sections(self, eip_number: int, eip_content: str) -> Dict[str, str]:
+        """Sections of *eip_content*, from the store when its hash matches."""
+        sha = hashlib.blake2b(eip_content.encode(), digest_size=16).hexdigest()
+        rows = self._query("SELECT sha, sections FROM sections WHERE eip=?", (eip_number,))
+        if rows and rows[0][0] == sha:
+            return json.loads(rows[0][1])
 
+        sections = self.extract_eip_sections(eip_content)
+        self._query("INSERT OR REPLACE INTO sections VALUES (?, ?, ?)",
+                    (eip_number, sha, json.dumps(sections)))
         return sections
 
+    def _sections_for(self, eip_number: int) -> Tuple[str, Dict[str, str]]:
+        """Return the EIP markdown and its (shared, read-only) section dict."""
+        eip_content = self.fetch_eip(eip_number)
+        return eip_content, self._sections_memo(eip_number, eip_content)
+
     def get_eip_specification_section(self, eip_number: int) -> str:
         """Return just the Specification section, or the first 10k chars as fallback."""
-        eip_content = self.fetch_eip(eip_number)
-        sections = self.extract_eip_sections(eip_content)
+        eip_content, sections = self._sections_for(eip_number)
         return sections.get("specification", eip_content[:10000])
 
     def get_eip1559_base_fee_spec(self) -> str:
@@ -228,38 +560,45 @@ class SpecFetcher:
         Returns:
             Text describing the base fee calculation algorithm
         """
-        eip_content = self.fetch_eip(1559)
-        sections = self.extract_eip_sections(eip_content)
+        _, sections = self._sections_for(1559)
 
         # Look for specification section
         spec_section = sections.get('specification', '')
 
-        # Extract base fee relevant parts
-        base_fee_spec: List[str] = []
-        in_base_fee = False
-
-        for line in spec_section.split('\n'):
-            line_lower = line.lower()
-            if 'base fee' in line_lower or 'basefee' in line_lower:
-                in_base_fee = True
-            if in_base_fee:
-                base_fee_spec.append(line)
-                if line.strip() == '' and len(base_fee_spec) > 5:
-                    break
-
-        return '\n'.join(base_fee_spec) if base_fee_spec else spec_section
+        # From the line that first mentions the base fee, keep going until
+        # a blank line at least six lines in
+        match = _BASE_FEE.search(spec_section)
+        if match is None:
+            return spec_section
+        start = spec_section.rfind('\n', 0, match.start()) + 1
+        pos = start
+        for _ in range(5):
+            pos = spec_section.find('\n', pos) + 1
+            if pos == 0:
+                return spec_section[start:]
+        blank = _BLANK_LINE.search(spec_section, pos)
+        return spec_section[start:blank.end() if blank else None]
 
     # ---- Cache management ----
 
     def clear_cache(self):
         """Clear the specification cache"""
-        import shutil
-        if self.cache_dir.exists():
-            shutil.rmtree(self.cache_dir)
-            self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self._sections_memo.cache_clear()
+        self._texts.clear()
+        self._query("DELETE FROM spec")
+        self._query("DELETE FROM sections")
+        if self.cache_dir is None:
+            return
+        # Sweep anything else in the directory (e.g. pre-SQLite cache files)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        for entry in self.cache_dir.iterdir():
+            if entry.name.startswith(_STORE_NAME):
+                continue
+            if entry.is_dir():
+                shutil.rmtree(entry)
+            else:
+                entry.unlink()
 
     def list_cached_specs(self) -> List[str]:
         """List all cached specification files"""
-        if not self.cache_dir.exists():
-            return []
-        return [f.name for f in self.cache_dir.iterdir() if f.is_file()]
+        return [key for (key,) in self._query("SELECT key FROM spec ORDER BY key")]
@@ -0,0 +1,84 @@
+"""Tests for the CLI analysis pipeline."""
+
+import sys
+import threading
+import time
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from unittest.mock import Mock, patch
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src import cli
+
+
+def _config(max_concurrency):
+    """A stand-in Config carrying only what _run_analysis reads."""
+    cfg = Mock(github_token=None, gemini_api_key="key", gemini_config={},
+               max_concurrency=max_concurrency)
+    cfg.get_eip_focus_areas.return_value = []
+    return cfg
+
+
+class TestRunAnalysis(unittest.TestCase):
+    """_run_analysis with fetchers and the LLM analyzer mocked out."""
+
+    def setUp(self):
+        self.code_files = {f"core/file{i}.go": f"package core // {i}" for i in range(6)}
+        spec_fetcher = Mock()
+        spec_fetcher.fetch_eip_spec.return_value = {"title": "EIP-1559", "eip_markdown": "# spec"}
+        code_fetcher = Mock()
+        code_fetcher.fetch_eip_implementation.return_value = self.code_files
+        for target, fetcher in (("src.cli._spec_fetcher", spec_fetcher),
+                                ("src.cli._code_fetcher", code_fetcher)):
+            patcher = patch(target, return_value=fetcher)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def test_pool_size_follows_max_concurrency(self):
+        """The analysis pool is sized by cfg.max_concurrency, not the file count"""
+        active, peak = [0], [0]
+        lock = threading.Lock()
+
+        def analyze(spec_text, code, context):
+            with lock:
+                active[0] += 1
+                peak[0] = max(peak[0], active[0])
+            time.sleep(0.02)
+            with lock:
+                active[0] -= 1
+            return Mock(to_dict=lambda: {"status": "FULL_MATCH"})
+
+        analyzer = Mock()
+        analyzer.analyze_compliance.side_effect = analyze
+        with patch("src.cli.GeminiAnalyzer", return_value=analyzer), \
+                patch("src.cli.ThreadPoolExecutor", wraps=ThreadPoolExecutor) as pool_cls:
+            results, _ = cli._run_analysis(1559, "go-ethereum", _config(3), "gemini")
+
+        self.assertEqual(len(results), len(self.code_files))
+        self.assertIn(3, [c.kwargs.get("max_workers") for c in pool_cls.call_args_list])
+        self.assertLessEqual(peak[0], 3)
+
+    def test_results_keep_input_order_when_completed_out_of_order(self):
+        """Results come back in file order even when later files finish first"""
+        paths = list(self.code_files)
+        finished = []
+
+        def analyze(spec_text, code, context):
+            # Earlier files take longer, so futures complete in reverse order
+            time.sleep(0.02 * (len(paths) - paths.index(context["file_name"])))
+            finished.append(context["file_name"])
+            return Mock(to_dict=lambda: {"status": "FULL_MATCH"})
+
+        analyzer = Mock()
+        analyzer.analyze_compliance.side_effect = analyze
+        with patch("src.cli.GeminiAnalyzer", return_value=analyzer):
+            results, _ = cli._run_analysis(1559, "go-ethereum", _config(len(paths)), "gemini")
+
+        self.assertNotEqual(finished, paths)
+        self.assertEqual([r["file_name"] for r in results], paths)
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
@@ -1,10 +1,27 @@
 """Tests for EIP-1559 analysis pipeline."""
 
+import gc
+import io
+import mmap
 import os
+import re
+import shutil
 import sys
+import tarfile
+import tempfile
+import threading
+import time
 import unittest
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from unittest.mock import Mock, patch
+from unittest.mock import MagicMock, Mock, patch
+
+import requests
+
+try:
+    import httpx
+except ImportError:
+    httpx = None
 
 # Add parent to path for imports
 sys.path.insert(0, str(Path(__file__).parent.parent))
@@ -16,9 +33,9 @@ except ImportError:
     pass
 
 from src.analyzer import AnalysisResult, GeminiAnalyzer, get_analyzer
-from src.code_fetcher import CodeFetcher
+from src.code_fetcher import HTTP2_AVAILABLE, ZSTD_AVAILABLE, CodeFetcher
 from src.config import Config
-from src.parser import CodeBlock, CodeParser
+from src.parser import HYPERSCAN_AVAILABLE, CodeBlock, CodeParser
 from src.spec_fetcher import SpecFetcher
 
 
@@ -56,6 +73,19 @@ class TestAnalyzer(unittest.TestCase):
         self.assertTrue(result.has_issues)
         self.assertEqual(len(result.high_severity_issues), 1)
 
+    @patch('google.genai.Client')
+    def test_json_reply_parses_same_with_or_without_orjson(self, mock_client_cls):
+        """Test that replies stdlib json accepts (NaN, big ints) parse either way"""
+        analyzer = GeminiAnalyzer(api_key="test_key")
+        reply = '{"status": "UNCERTAIN", "confidence": NaN, "gas": 340282366920938463463374607431768211455}'
+        parsed = [analyzer._parse_json_response(reply)]
+        with patch("src.analyzer.ORJSON_AVAILABLE", False):
+            parsed.append(analyzer._parse_json_response(reply))
+
+        for result in parsed:
+            self.assertEqual(result["gas"], 2 ** 128 - 1)
+            self.assertNotEqual(result["confidence"], result["confidence"])  # NaN
+
     def test_get_analyzer_gemini(self):
         """Test get_analyzer factory for Gemini"""
         with patch('google.genai.Client'):
@@ -99,17 +129,29 @@ class TestAnalyzer(unittest.TestCase):
 class TestSpecFetcher(unittest.TestCase):
     """Tests for the specification fetcher"""
 
-    def setUp(self):
-        self.fetcher = SpecFetcher(cache_dir="/tmp/prspec_test_cache")
+    @classmethod
+    def setUpClass(cls):
+        # One fetcher (and one SQLite store) for the whole class
+        cls.fetcher = SpecFetcher(cache_dir=tempfile.mkdtemp(prefix="prspec_"))
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(cls.fetcher.cache_dir, ignore_errors=True)
 
     def tearDown(self):
         self.fetcher.clear_cache()
+        self.fetcher.cache_ttl_seconds = 86400
+        self.fetcher._h2_client = None
 
     @patch('requests.Session.get')
     def test_fetch_eip(self, mock_get):
         """Test fetching an EIP"""
         mock_response = Mock()
         mock_response.text = "# EIP-1559\n\nTest content"
+        mock_response.content = mock_response.text.encode()
+        mock_response.iter_content.return_value = [mock_response.content]
+        mock_response.status_code = 200
+        mock_response.headers = {}
         mock_response.raise_for_status = Mock()
         mock_get.return_value = mock_response
 
@@ -118,6 +160,277 @@ class TestSpecFetcher(unittest.TestCase):
         self.assertIn("EIP-1559", content)
         mock_get.assert_called()
 
+    @patch('requests.Session.get')
+    def test_stale_spec_revalidated_with_etag(self, mock_get):
+        """Test that an expired cached spec is revalidated and a 304 reuses it"""
+        fresh = Mock()
+        fresh.iter_content.return_value = [b"# EIP-1559\n\nOriginal"]
+        fresh.status_code = 200
+        fresh.headers = {"ETag": '"abc"'}
+        not_modified = Mock()
+        not_modified.status_code = 304
+        mock_get.side_effect = [fresh, not_modified]
+
+        self.fetcher.cache_ttl_seconds = 0
+        first = self.fetcher.fetch_eip(1559)
+        second = self.fetcher.fetch_eip(1559)
+
+        self.assertEqual(first, second)
+        self.assertEqual(mock_get.call_args.kwargs["headers"], {"If-None-Match": '"abc"'})
+        self.assertEqual(self.fetcher.list_cached_specs(), ["eip-1559.md"])
+
+    @patch('requests.Session.get')
+    def test_concurrent_fetches_share_one_download(self, mock_get):
+        """Test that simultaneous fetches of one spec issue a single GET"""
+        release = threading.Event()
+        response = Mock()
+        response.iter_content.return_value = [b"# EIP-4788"]
+        response.status_code = 200
+        response.headers = {}
+
+        def slow_get(*args, **kwargs):
+            release.wait(5)
+            return response
+        mock_get.side_effect = slow_get
+
+        with ThreadPoolExecutor(max_workers=4) as pool:
+            futures = [pool.submit(self.fetcher.fetch_eip, 4788) for _ in range(4)]
+            time.sleep(0.05)
+            release.set()
+            texts = [f.result() for f in futures]
+
+        self.assertEqual(texts, ["# EIP-4788"] * 4)
+        self.assertEqual(mock_get.call_count, 1)
+
+    @patch('requests.Session.get')
+    def test_revalidate_does_not_join_cached_fetch(self, mock_get):
+        """Test that a revalidating fetch isn't coalesced onto a plain cached one"""
+        self.fetcher._write_spec("eip-7251.md", b"# stale\n", etag='"v1"')
+        release = threading.Event()
+        stale_read = threading.Event()
+        load = self.fetcher._load
+
+        def gated_load(url, key, use_cache, revalidate):
+            if not revalidate:
+                stale_read.set()
+                release.wait(5)
+            return load(url, key, use_cache, revalidate)
+
+        response = Mock(status_code=200, headers={})
+        response.iter_content.return_value = [b"# fresh\n"]
+        mock_get.return_value = response
+
+        with patch.object(self.fetcher, "_load", side_effect=gated_load), \
+                ThreadPoolExecutor(max_workers=2) as pool:
+            self.fetcher._texts.clear()
+            cached = pool.submit(self.fetcher.fetch_eip, 7251)
+            self.assertTrue(stale_read.wait(5))
+            forced = pool.submit(self.fetcher.fetch_eip, 7251, revalidate=True)
+            self.assertEqual(forced.result(timeout=5), "# fresh\n")
+            release.set()
+            cached.result(timeout=5)
+
+        mock_get.assert_called_once()
+
+    @patch('requests.Session.get')
+    def test_spec_paths_requested_in_parallel(self, mock_get):
+        """Test that fetch_eip_spec has all its GETs in flight at once"""
+        info = SpecFetcher.EIP_REGISTRY[4844]
+        expected = 1 + len(info["execution_spec_paths"]) + len(info["consensus_spec_paths"])
+        # Every GET blocks until all of them have started; a serial loop
+        # would break the barrier instead of passing it
+        barrier = threading.Barrier(expected, timeout=5)
+        response = Mock()
+        response.iter_content.return_value = [b"# spec"]
+        response.status_code = 200
+        response.headers = {}
+
+        def gated_get(*args, **kwargs):
+            barrier.wait()
+            return response
+        mock_get.side_effect = gated_get
+
+        result = self.fetcher.fetch_eip_spec(4844)
+
+        self.assertEqual(mock_get.call_count, expected)
+        self.assertEqual(result["execution_spec"], "# spec")
+
+    @patch('requests.Session.get')
+    def test_failed_spec_path_falls_through(self, mock_get):
+        """Test that a timed-out or retried-out spec path is skipped, not raised"""
+        info = SpecFetcher.EIP_REGISTRY[4844]
+        first_exec, second_exec = info["execution_spec_paths"]
+        first_consensus = info["consensus_spec_paths"][0]
+
+        def get(url, **kwargs):
+            if url.endswith(first_exec):
+                raise requests.exceptions.RetryError("too many 429 error responses")
+            if url.endswith(first_consensus):
+                raise requests.exceptions.ReadTimeout("read timed out")
+            response = Mock(status_code=200, headers={})
+            response.iter_content.return_value = [f"# {url.rsplit('/', 1)[-1]}".encode()]
+            return response
+        mock_get.side_effect = get
+
+        result = self.fetcher.fetch_eip_spec(4844)
+
+        self.assertEqual(result["execution_spec"], f"# {second_exec.rsplit('/', 1)[-1]}")
+        self.assertEqual(result["consensus_spec"],
+                         f"# {info['consensus_spec_paths'][1].rsplit('/', 1)[-1]}")
+        adapter = self.fetcher.session.get_adapter("https://raw.githubusercontent.com/")
+        self.assertFalse(adapter.max_retries.raise_on_status)
+
+    def test_invalid_utf8_spec_decoded_with_replacement(self):
+        """Test that a stray non-UTF-8 byte in a cached spec doesn't raise"""
+        self.fetcher._write_spec("eip-7251.md", b"# EIP-7251 \xff\n")
+        self.assertEqual(self.fetcher.fetch_eip(7251), "# EIP-7251 \ufffd\n")
+
+    def test_repeat_fetch_served_from_memory(self):
+        """Test that a fresh spec is decoded once per fetcher, not per call"""
+        self.fetcher._write_spec("eip-7002.md", b"# EIP-7002\n")
+        first = self.fetcher.fetch_eip(7002)
+
+        with patch.object(self.fetcher, "_query") as query:
+            second = self.fetcher.fetch_eip(7002)
+        query.assert_not_called()
+        self.assertEqual(first, second)
+
+    @patch('requests.Session.get')
+    def test_revalidate_forces_conditional_get(self, mock_get):
+        """Test that revalidate=True checks a fresh cached spec with its ETag"""
+        self.fetcher._write_spec("eip-2930.md", b"# EIP-2930\n", etag='"v1"')
+        not_modified = Mock()
+        not_modified.status_code = 304
+        mock_get.return_value = not_modified
+
+        self.assertEqual(self.fetcher.fetch_eip(2930), "# EIP-2930\n")
+        self.assertFalse(mock_get.called)
+
+        self.assertEqual(self.fetcher.fetch_eip(2930, revalidate=True), "# EIP-2930\n")
+        self.assertEqual(mock_get.call_args.kwargs["headers"], {"If-None-Match": '"v1"'})
+
+    @patch('requests.Session.get')
+    def test_http2_client_used_when_enabled(self, mock_get):
+        """Test that spec downloads go through the HTTP/2 client when one is set"""
+        reply = Mock()
+        reply.status_code = 200
+        reply.reason_phrase = "OK"
+        reply.headers = {"ETag": '"h2"'}
+        reply.content = b"# EIP-4844\n\nBlobs"
+        self.fetcher._h2_client = Mock()
+        self.fetcher._h2_client.get.return_value = reply
+
+        content = self.fetcher.fetch_eip(4844, use_cache=False)
+
+        self.assertEqual(content, "# EIP-4844\n\nBlobs")
+        self.assertFalse(mock_get.called)
+        self.assertEqual(
+            self.fetcher._query("SELECT etag FROM spec WHERE key='eip-4844.md'"), [('"h2"',)]
+        )
+
+    @unittest.skipIf(not HTTP2_AVAILABLE, "httpx[http2] not installed")
+    def test_http2_transport_errors_fall_through(self):
+        """Test that httpx errors on one spec path fall through to the next source"""
+        info = SpecFetcher.EIP_REGISTRY[4844]
+        fetcher = SpecFetcher(cache_dir=":memory:", use_http2=True)
+
+        def h2_get(url, **kwargs):
+            if url.endswith(info["execution_spec_paths"][0]):
+                raise httpx.ConnectError("connection refused")
+            if url.endswith(info["consensus_spec_paths"][0]):
+                raise httpx.ReadTimeout("read timed out")
+            return Mock(status_code=200, reason_phrase="OK", headers={},
+                        content=f"# {url.rsplit('/', 1)[-1]}".encode())
+        fetcher._h2_client.get = Mock(side_effect=h2_get)
+
+        result = fetcher.fetch_eip_spec(4844)
+
+        self.assertEqual(result["eip_markdown"], "# eip-4844.md")
+        self.assertEqual(result["execution_spec"],
+                         f"# {info['execution_spec_paths'][1].rsplit('/', 1)[-1]}")
+        self.assertEqual(result["consensus_spec"],
+                         f"# {info['consensus_spec_paths'][1].rsplit('/', 1)[-1]}")
+
+    @unittest.skipIf(not HTTP2_AVAILABLE, "httpx[http2] not installed")
+    def test_http2_client_closed_with_fetcher(self):
+        """Test that the httpx client is closed when its fetcher is collected"""
+        fetcher = SpecFetcher(cache_dir=":memory:", use_http2=True)
+        client = fetcher._h2_client
+        del fetcher
+        gc.collect()
+        self.assertTrue(client.is_closed)
+
+    @patch('requests.Session.post')
+    @patch('requests.Session.get')
+    def test_spec_paths_batched_through_graphql(self, mock_get, mock_post):
+        """Test that an authenticated fetch_eip_spec pulls spec files in one GraphQL call"""
+        fetcher = SpecFetcher(github_token="t", cache_dir=str(self.fetcher.cache_dir))
+        markdown = Mock()
+        markdown.iter_content.return_value = [b"# EIP-4844"]
+        markdown.status_code = 200
+        markdown.headers = {}
+        mock_get.return_value = markdown
+
+        def graphql(url, json, **kwargs):
+            paths = SpecFetcher.EIP_REGISTRY[4844][
+                "execution_spec_paths" if json["variables"]["name"] == "execution-specs"
+                else "consensus_spec_paths"
+            ]
+            reply = Mock()
+            reply.json.return_value = {"data": {"repository": {
+                f"f{i}": {"text": f"# {path}"} for i, path in enumerate(paths)
+            }}}
+            return reply
+        mock_post.side_effect = graphql
+
+        result = fetcher.fetch_eip_spec(4844)
+
+        self.assertEqual(mock_post.call_count, 2)
+        self.assertEqual(mock_get.call_count, 1)  # only the EIP markdown
+        self.assertEqual(result["execution_spec"], "# src/ethereum/cancun/fork.py")
+        self.assertIn("# specs/deneb/beacon-chain.md", result["consensus_spec"])
+
+    @patch('requests.Session.post')
+    @patch('requests.Session.get')
+    def test_truncated_graphql_specs_fetched_raw(self, mock_get, mock_post):
+        """Test that truncated GraphQL spec blobs are downloaded raw, not cached cut short"""
+        fetcher = SpecFetcher(github_token="t", cache_dir=str(self.fetcher.cache_dir))
+        paths = SpecFetcher.EIP_REGISTRY[4844]["consensus_spec_paths"]
+        reply = Mock()
+        reply.json.return_value = {"data": {"repository": {
+            "f0": {"text": "# Deneb -- Beacon Chain\n\n## Intro", "isTruncated": True},
+            "f1": {"text": "# Polynomial commitments", "isTruncated": False},
+        }}}
+        mock_post.return_value = reply
+        full = Mock(status_code=200, headers={})
+        full.iter_content.return_value = [b"# Deneb -- Beacon Chain\n\n## Intro\n\n## Blobs"]
+        mock_get.return_value = full
+
+        found = fetcher.fetch_paths_bulk("consensus-specs", paths)
+
+        self.assertIn("isTruncated", mock_post.call_args.kwargs["json"]["query"])
+        self.assertEqual(mock_get.call_count, 1)
+        self.assertTrue(mock_get.call_args.args[0].endswith(paths[0]))
+        self.assertTrue(found[paths[0]].endswith("## Blobs"))
+        self.assertEqual(found[paths[1]], "# Polynomial commitments")
+
+    @patch('requests.Session.get')
+    def test_prefetch_warms_supported_eips(self, mock_get):
+        """Test that prefetch=True fills the cache for every supported EIP"""
+        response = Mock()
+        response.iter_content.return_value = [b"# spec"]
+        response.status_code = 200
+        response.headers = {}
+        mock_get.return_value = response
+
+        fetcher = SpecFetcher(cache_dir=str(self.fetcher.cache_dir), prefetch=True)
+        errors = fetcher.wait_prefetch()
+
+        self.assertEqual(errors, {eip: None for eip in SpecFetcher.supported_eips()})
+        cached = fetcher.list_cached_specs()
+        for eip in SpecFetcher.supported_eips():
+            self.assertIn(f"eip-{eip}.md", cached)
+
     def test_extract_eip_sections(self):
         """Test extracting sections from EIP markdown"""
         eip_content = """# EIP-1559
@@ -137,17 +450,72 @@ This is the rationale.
         self.assertIn("specification", sections)
         self.assertIn("rationale", sections)
 
+    def test_sections_cached_on_disk(self):
+        """Test that parsed sections are persisted and reused for unchanged markdown"""
+        self.fetcher._write_spec("eip-1559.md", b"# EIP-1559\n\n## Specification\nBase fee rules.\n")
+
+        first = self.fetcher.get_eip_specification_section(1559)
+
+        fresh = SpecFetcher(cache_dir=str(self.fetcher.cache_dir))
+        with patch.object(fresh, "extract_eip_sections") as extract:
+            second = fresh.get_eip_specification_section(1559)
+        extract.assert_not_called()
+        self.assertEqual(first, second)
+        self.assertIn("Base fee rules.", second)
+
+    @patch('requests.Session.get')
+    def test_in_memory_store(self, mock_get):
+        """Test that a ":memory:" fetcher caches specs without touching disk"""
+        response = Mock()
+        response.iter_content.return_value = [b"# EIP-1559"]
+        response.status_code = 200
+        response.headers = {}
+        mock_get.return_value = response
+
+        with patch.object(Path, "mkdir") as mkdir:
+            fetcher = SpecFetcher(cache_dir=":memory:")
+            fetcher.fetch_eip(1559)
+            fetcher.clear_cache()
+            fetcher.fetch_eip(1559)
+            fetcher.fetch_eip(1559)
+        mkdir.assert_not_called()
+
+        self.assertIsNone(fetcher.cache_dir)
+        self.assertEqual(mock_get.call_count, 2)
+        self.assertEqual(fetcher.list_cached_specs(), ["eip-1559.md"])
+
+    def test_fetchers_share_connection_pool(self):
+        """Test that fetchers reuse one connection pool but keep their own headers"""
+        other = SpecFetcher(github_token="tok-a", cache_dir=str(self.fetcher.cache_dir))
+        url = "https://raw.githubusercontent.com/"
+        self.assertIs(other.session.get_adapter(url), self.fetcher.session.get_adapter(url))
+        self.assertIn("Authorization", other.session.headers)
+        self.assertNotIn("Authorization", self.fetcher.session.headers)
+
     def test_list_cached_specs(self):
         """Test listing cached specs"""
         specs = self.fetcher.list_cached_specs()
         self.assertIsInstance(specs, list)
 
+    def test_clear_cache_empties_store(self):
+        """Test that clear_cache drops cached specs and legacy cache files"""
+        self.fetcher._write_spec("eip-1559.md", b"# EIP-1559\n")
+        (self.fetcher.cache_dir / "eip-1559.md.meta.json").write_text("{}")
+
+        self.fetcher.clear_cache()
+
+        self.assertEqual(self.fetcher.list_cached_specs(), [])
+        self.assertFalse((self.fetcher.cache_dir / "eip-1559.md.meta.json").exists())
+        self.assertTrue((self.fetcher.cache_dir / "specs.sqlite").exists())
+
 
 class TestCodeFetcher(unittest.TestCase):
     """Tests for the code fetcher"""
 
     def setUp(self):
-        self.fetcher = CodeFetcher(cache_dir="/tmp/prspec_test_code_cache")
+        self.cache_dir = tempfile.mkdtemp(prefix="prspec_test_code_")
+        self.addCleanup(shutil.rmtree, self.cache_dir, ignore_errors=True)
+        self.fetcher = CodeFetcher(cache_dir=self.cache_dir)
 
     def tearDown(self):
         self.fetcher.clear_cache()
@@ -157,6 +525,10 @@ class TestCodeFetcher(unittest.TestCase):
         """Test fetching a file from GitHub"""
         mock_response = Mock()
         mock_response.text = "package main\n\nfunc main() {}"
+        mock_response.content = mock_response.text.encode()
+        mock_response.iter_content.return_value = [mock_response.content]
+        mock_response.status_code = 200
+        mock_response.headers = {}
         mock_response.raise_for_status = Mock()
         mock_get.return_value = mock_response
 
@@ -166,6 +538,582 @@ class TestCodeFetcher(unittest.TestCase):
 
         self.assertIn("package main", content)
 
+    @patch('requests.Session.get')
+    def test_fetch_file_revalidates_with_etag(self, mock_get):
+        """A 304 on refetch should return the cached body"""
+        fresh = Mock(status_code=200, content=b"package main", headers={
+            "ETag": '"abc"', "Last-Modified": "Tue, 01 Oct 2024 00:00:00 GMT",
+        })
+        fresh.iter_content.return_value = [fresh.content]
+        not_modified = Mock(status_code=304, headers={})
+        mock_get.side_effect = [fresh, not_modified]
+
+        self.fetcher.fetch_file("ethereum", "go-ethereum", "main.go")
+        content = self.fetcher.fetch_file("ethereum", "go-ethereum", "main.go", revalidate=True)
+
+        self.assertEqual(content, "package main")
+        self.assertEqual(mock_get.call_count, 2)
+        _, kwargs = mock_get.call_args
+        self.assertEqual(kwargs["headers"]["If-None-Match"], '"abc"')
+        self.assertIn("If-Modified-Since", kwargs["headers"])
+
+    @patch('requests.Session.get')
+    def test_stale_cache_entry_is_revalidated(self, mock_get):
+        """Test that entries past the TTL are revalidated, fresh ones aren't"""
+        fresh = Mock(status_code=200, content=b"package main", headers={"ETag": '"abc"'})
+        fresh.iter_content.return_value = [fresh.content]
+        mock_get.return_value = fresh
+        self.fetcher.fetch_file("ethereum", "go-ethereum", "main.go")
+
+        mock_get.reset_mock()
+        self.fetcher.fetch_file("ethereum", "go-ethereum", "main.go")
+        mock_get.assert_not_called()
+
+        ref_file = self.fetcher._ref_file("ethereum", "go-ethereum", "main.go", "master")
+        old = ref_file.stat().st_mtime - self.fetcher.cache_ttl_seconds - 1
+        os.utime(ref_file, (old, old))
+        mock_get.return_value = Mock(status_code=304, headers={})
+
+        content = self.fetcher.fetch_file("ethereum", "go-ethereum", "main.go")
+        self.assertEqual(content, "package main")
+        self.assertEqual(mock_get.call_args.kwargs["headers"]["If-None-Match"], '"abc"')
+        self.assertGreater(ref_file.stat().st_mtime, old)
+
+    @patch('requests.Session.get')
+    def test_vanished_object_refetched_with_credentials(self, mock_get):
+        """Test that the post-304 refetch of a private file retries with the token"""
+        def reply(status, body=b""):
+            response = Mock(status_code=status, headers={"ETag": '"v1"'} if body else {})
+            response.iter_content.return_value = [body]
+            return response
+
+        fetcher = CodeFetcher(github_token="tok-a", cache_dir=self.cache_dir)
+        mock_get.side_effect = [reply(404), reply(200, b"package private")]
+        fetcher.fetch_file("acme", "node", "main.go")
+        ref_file = fetcher._ref_file("acme", "node", "main.go", "master")
+        fetcher._resolve_ref(ref_file).unlink()
+
+        mock_get.side_effect = [reply(404), reply(304), reply(404), reply(200, b"package private")]
+        content = fetcher.fetch_file("acme", "node", "main.go", revalidate=True)
+
+        self.assertEqual(content, "package private")
+        last = mock_get.call_args.kwargs["headers"]
+        self.assertEqual(last, {"Authorization": "token tok-a"})
+
+    @unittest.skipIf(not HTTP2_AVAILABLE, "httpx[http2] not installed")
+    def test_http2_transport_errors_fail_one_file_only(self):
+        """Test that httpx errors surface as requests errors, per file"""
+        fetcher = CodeFetcher(cache_dir=self.cache_dir, use_http2=True)
+        paths = CodeFetcher.CLIENTS["go-ethereum"]["eip_files"][1559]
+
+        def h2_get(url, **kwargs):
+            if url.endswith(paths[0]):
+                raise httpx.ConnectError("connection refused")
+            if url.endswith(paths[1]):
+                raise httpx.ReadTimeout("read timed out")
+            return Mock(status_code=200, reason_phrase="OK", headers={}, content=b"package misc")
+        fetcher._h2_client.get = Mock(side_effect=h2_get)
+
+        files = fetcher.fetch_eip_implementation("go-ethereum", 1559)
+
+        self.assertIn("connection refused", files[paths[0]])
+        self.assertIn("read timed out", files[paths[1]])
+        self.assertTrue(all(files[p] == "package misc" for p in paths[2:]))
+
+    @unittest.skipIf(not HTTP2_AVAILABLE, "httpx[http2] not installed")
+    def test_http2_client_closed_with_fetcher(self):
+        """Test that the httpx client is closed when its fetcher is collected"""
+        fetcher = CodeFetcher(cache_dir=self.cache_dir, use_http2=True)
+        client = fetcher._h2_client
+        del fetcher
+        gc.collect()
+        self.assertTrue(client.is_closed)
+
+    @patch('requests.Session.get')
+    def test_missing_file_is_negatively_cached(self, mock_get):
+        """Test that a 404 is remembered instead of re-probed"""
+        not_found = Mock(status_code=404, headers={})
+        not_found.raise_for_status.side_effect = requests.HTTPError("404 Client Error")
+        mock_get.return_value = not_found
+
+        with self.assertRaises(requests.HTTPError):
+            self.fetcher.fetch_file("ethereum", "go-ethereum", "moved.go")
+        mock_get.reset_mock()
+
+        with self.assertRaises(requests.HTTPError) as ctx:
+            self.fetcher.fetch_file("ethereum", "go-ethereum", "moved.go")
+        mock_get.assert_not_called()
+        self.assertEqual(ctx.exception.response.status_code, 404)
+
+    @patch('requests.Session.get')
+    def test_successful_refetch_clears_negative_entry(self, mock_get):
+        """Test that a path which 404'd is served normally once it exists"""
+        not_found = Mock(status_code=404, headers={})
+        not_found.raise_for_status.side_effect = requests.HTTPError("404 Client Error")
+        found = Mock(status_code=200, headers={})
+        found.iter_content.return_value = [b"package moved"]
+        mock_get.side_effect = [not_found, found]
+
+        with self.assertRaises(requests.HTTPError):
+            self.fetcher.fetch_file("ethereum", "go-ethereum", "moved.go")
+        content = self.fetcher.fetch_file("ethereum", "go-ethereum", "moved.go", use_cache=False)
+
+        self.assertEqual(content, "package moved")
+        ref_file = self.fetcher._ref_file("ethereum", "go-ethereum", "moved.go", "master")
+        self.assertFalse(self.fetcher._negative_file(ref_file).exists())
+        self.assertEqual(self.fetcher.fetch_file("ethereum", "go-ethereum", "moved.go"),
+                         "package moved")
+        self.assertEqual(mock_get.call_count, 2)
+
+    @patch('requests.Session.get')
+    def test_fetch_files_bulk(self, mock_get):
+        """Test picking several files out of one repo tarball"""
+        buf = io.BytesIO()
+        with tarfile.open(fileobj=buf, mode="w:gz") as archive:
+            for name, body in [("go-ethereum-master/a.go", b"package a"),
+                               ("go-ethereum-master/b/b.go", b"package b"),
+                               ("go-ethereum-master/other.go", b"package other")]:
+                info = tarfile.TarInfo(name)
+                info.size = len(body)
+                archive.addfile(info, io.BytesIO(body))
+        buf.seek(0)
+
+        mock_response = MagicMock()
+        mock_response.raw = buf
+        mock_response.__enter__.return_value = mock_response
+        mock_get.return_value = mock_response
+
+        files = self.fetcher.fetch_files_bulk(
+            "ethereum", "go-ethereum", ["a.go", "b/b.go", "missing.go"]
+        )
+
+        self.assertEqual(files, {"a.go": "package a", "b/b.go": "package b"})
+        self.assertEqual(mock_get.call_count, 1)
+
+    @patch('requests.Session.get')
+    def test_non_utf8_source_decoded_with_replacement(self, mock_get):
+        """Test that a stray non-UTF-8 byte in a client file doesn't raise"""
+        paths = CodeFetcher.CLIENTS["go-ethereum"]["eip_files"][1559]
+
+        def fake_get(url, **kwargs):
+            if "/git/trees/" in url:
+                tree = Mock()
+                tree.json.return_value = {"tree": [{"path": p, "type": "blob", "sha": f"{i:04x}"}
+                                                   for i, p in enumerate(paths)]}
+                return tree
+            response = Mock(status_code=200, headers={}, content=b"// caf\xe9 " + url[-4:].encode())
+            response.iter_content.return_value = [response.content]
+            return response
+        mock_get.side_effect = fake_get
+
+        for strategy in ("raw", "tree"):
+            fetcher = CodeFetcher(cache_dir=tempfile.mkdtemp(dir=self.cache_dir))
+            files = fetcher.fetch_eip_implementation("go-ethereum", 1559, strategy=strategy)
+            self.assertTrue(all(body.startswith("// caf\ufffd") for body in files.values()),
+                            strategy)
+
+    def test_failed_atomic_write_leaves_no_temp_file(self):
+        """Test that a failed cache write doesn't strand its temp file"""
+        target = self.fetcher.cache_dir / "refs" / "x"
+        before = set(self.fetcher.cache_dir.iterdir())
+        with patch("src.code_fetcher.os.replace", side_effect=OSError(28, "No space left")):
+            with self.assertRaises(OSError):
+                self.fetcher._atomic_write(target, b"data")
+        self.assertEqual(set(self.fetcher.cache_dir.iterdir()) - before,
+                         {self.fetcher.cache_dir / "refs"})
+        self.assertFalse(target.exists())
+
+    @patch('requests.Session.get')
+    def test_fetch_file_mmap(self, mock_get):
+        """Test mapping a cached file for bytes-level scanning"""
+        mock_response = Mock()
+        mock_response.content = b"package core\n\nfunc CalcBaseFee() {}\n"
+        mock_response.iter_content.return_value = [mock_response.content]
+        mock_response.status_code = 200
+        mock_response.headers = {}
+        mock_get.return_value = mock_response
+
+        fetcher = CodeFetcher(cache_dir=self.cache_dir, compress=False)
+        mapped = fetcher.fetch_file_mmap("ethereum", "go-ethereum", "core/fee.go")
+        self.assertIsInstance(mapped, mmap.mmap)
+        try:
+            self.assertEqual(mapped[:12], b"package core")
+            self.assertIsNotNone(re.search(rb"func\s+(\w+)", mapped))
+        finally:
+            mapped.close()
+
+    @unittest.skipIf(not ZSTD_AVAILABLE, "zstandard not installed")
+    @patch('requests.Session.get')
+    def test_cache_objects_are_compressed(self, mock_get):
+        """Test that objects are stored zstd-compressed and read back intact"""
+        body = b"package core\n" * 500
+        mock_response = Mock(status_code=200, content=body, headers={})
+        mock_response.iter_content.return_value = [body[:1000], body[1000:]]
+        mock_get.return_value = mock_response
+
+        content = self.fetcher.fetch_file("ethereum", "go-ethereum", "core/big.go")
+        self.assertEqual(content, body.decode())
+
+        ref_file = self.fetcher._ref_file("ethereum", "go-ethereum", "core/big.go", "master")
+        object_file = self.fetcher._resolve_ref(ref_file)
+        self.assertLess(object_file.stat().st_size, len(body))
+        self.assertEqual(self.fetcher.fetch_file_mmap("ethereum", "go-ethereum", "core/big.go"), body)
+
+    @patch('requests.Session.get')
+    def test_cache_is_content_addressed(self, mock_get):
+        """Test that identical bodies on two branches share one object"""
+        mock_response = Mock()
+        mock_response.content = b"package core"
+        mock_response.iter_content.return_value = [mock_response.content]
+        mock_response.status_code = 200
+        mock_response.headers = {}
+        mock_get.return_value = mock_response
+
+        self.fetcher.fetch_file("ethereum", "go-ethereum", "core/a.go", branch="master")
+        self.fetcher.fetch_file("ethereum", "go-ethereum", "core/a.go", branch="release")
+
+        sha = self.fetcher._blob_sha(b"package core")
+        self.assertEqual(sha, "fc8dfb9dbe305c8b8b27bf8cde8ddc9d0632f0a7")  # git hash-object
+        objects = [f for f in (self.fetcher.cache_dir / "objects").rglob("*") if f.is_file()]
+        self.assertEqual(objects, [self.fetcher._object_file(sha)])
+        self.assertEqual(len(self.fetcher.list_cached_files()), 2)
+
+    @patch('requests.Session.get')
+    def test_fetch_files_via_tree(self, mock_get):
+        """Test resolving blob SHAs once and fetching blobs by SHA"""
+        tree_response = Mock()
+        tree_response.json.return_value = {"tree": [
+            {"path": "a.go", "type": "blob", "sha": "aa11"},
+            {"path": "b", "type": "tree", "sha": "bb00"},
+            {"path": "b/b.go", "type": "blob", "sha": "bb22"},
+        ]}
+
+        def fake_get(url, **kwargs):
+            if "/git/trees/" in url:
+                return tree_response
+            blob = Mock()
+            blob.content = b"package a" if url.endswith("aa11") else b"package b"
+            return blob
+
+        mock_get.side_effect = fake_get
+
+        files = self.fetcher.fetch_files_via_tree(
+            "ethereum", "go-ethereum", ["a.go", "b/b.go", "missing.go"]
+        )
+        self.assertEqual(files, {"a.go": "package a", "b/b.go": "package b"})
+        self.assertEqual(mock_get.call_count, 3)
+
+        # Tree is memoized and blobs are content-addressed on disk
+        mock_get.reset_mock()
+        files = self.fetcher.fetch_files_via_tree("ethereum", "go-ethereum", ["a.go"])
+        self.assertEqual(files, {"a.go": "package a"})
+        mock_get.assert_not_called()
+
+    @patch('requests.Session.get')
+    def test_truncated_tree_falls_back_to_raw(self, mock_get):
+        """Test that paths absent from a truncated tree listing are fetched raw"""
+        tree_response = Mock()
+        tree_response.json.return_value = {"truncated": True, "tree": [
+            {"path": "a.go", "type": "blob", "sha": "aa11"},
+        ]}
+
+        def fake_get(url, **kwargs):
+            if "/git/trees/" in url:
+                return tree_response
+            if url.endswith("aa11"):
+                return Mock(content=b"package a")
+            response = Mock(status_code=200, headers={})
+            response.iter_content.return_value = [b"package deep"]
+            return response
+        mock_get.side_effect = fake_get
+
+        files = self.fetcher.fetch_files_via_tree("ethereum", "go-ethereum", ["a.go", "deep/x.go"])
+
+        self.assertEqual(files, {"a.go": "package a", "deep/x.go": "package deep"})
+        self.assertIn("raw.githubusercontent.com", mock_get.call_args_list[-1].args[0])
+
+    @patch('requests.Session.get')
+    def test_tree_memo_expires_with_cache_ttl(self, mock_get):
+        """Test that a branch tree is re-resolved once cache_ttl_seconds passes"""
+        listings = iter(["aa11", "bb22"])
+
+        def fake_get(url, **kwargs):
+            if "/git/trees/" in url:
+                tree = Mock()
+                tree.json.return_value = {"tree": [{"path": "a.go", "type": "blob",
+                                                    "sha": next(listings)}]}
+                return tree
+            return Mock(content=f"package {url[-4:]}".encode())
+        mock_get.side_effect = fake_get
+
+        fetch = self.fetcher.fetch_files_via_tree
+        self.assertEqual(fetch("ethereum", "go-ethereum", ["a.go"]), {"a.go": "package aa11"})
+        self.assertEqual(fetch("ethereum", "go-ethereum", ["a.go"]), {"a.go": "package aa11"})
+
+        self.fetcher.cache_ttl_seconds = 0
+        self.assertEqual(fetch("ethereum", "go-ethereum", ["a.go"]), {"a.go": "package bb22"})
+
+    @patch('requests.Session.get')
+    @patch('requests.Session.post')
+    def test_fetch_files_graphql(self, mock_post, mock_get):
+        """Test fetching several files in one GraphQL query and caching them"""
+        fetcher = CodeFetcher(github_token="tok-a", cache_dir=str(self.fetcher.cache_dir))
+
+        def graphql(url, json, **kwargs):
+            self.assertEqual(kwargs["headers"]["Authorization"], "bearer tok-a")
+            self.assertIn('"master:a.go"', json["query"])
+            reply = Mock()
+            reply.json.return_value = {"data": {"repository": {
+                "f0": {"text": "package a"}, "f1": None,
+            }}}
+            return reply
+        mock_post.side_effect = graphql
+
+        files = fetcher.fetch_files_graphql("ethereum", "go-ethereum", ["a.go", "missing.go"])
+        self.assertEqual(files, {"a.go": "package a"})
+        self.assertEqual(mock_post.call_count, 1)
+
+        # Stored like a raw download, so the next fetch stays on disk
+        mock_post.reset_mock()
+        self.assertEqual(fetcher.fetch_file("ethereum", "go-ethereum", "a.go"), "package a")
+        mock_post.assert_not_called()
+        mock_get.assert_not_called()
+
+    @patch('requests.Session.get')
+    @patch('requests.Session.post')
+    def test_fetch_files_graphql_refetches_truncated_blobs(self, mock_post, mock_get):
+        """Test that truncated GraphQL blobs are downloaded raw, not cached cut short"""
+        fetcher = CodeFetcher(github_token="tok-a", cache_dir=str(self.fetcher.cache_dir))
+
+        def graphql(url, json, **kwargs):
+            self.assertIn("isTruncated", json["query"])
+            reply = Mock()
+            reply.json.return_value = {"data": {"repository": {
+                "f0": {"text": "package big // first half", "isTruncated": True},
+                "f1": {"text": None, "isTruncated": False},
+            }}}
+            return reply
+        mock_post.side_effect = graphql
+
+        def raw(url, **kwargs):
+            response = Mock(status_code=200, headers={})
+            response.iter_content.return_value = [f"// raw {url.rsplit('/', 1)[-1]}".encode()]
+            return response
+        mock_get.side_effect = raw
+
+        files = fetcher.fetch_files_graphql("ethereum", "go-ethereum", ["big.go", "odd.go"])
+
+        self.assertEqual(files, {"big.go": "// raw big.go", "odd.go": "// raw odd.go"})
+        self.assertEqual(mock_get.call_count, 2)
+
+    @patch('requests.Session.get')
+    def test_strategy_raw(self, mock_get):
+        """Test that strategy="raw" downloads each file from raw.githubusercontent"""
+        def raw(url, **kwargs):
+            response = Mock(status_code=200, headers={})
+            response.iter_content.return_value = [f"// {url.rsplit('/', 1)[-1]}".encode()]
+            return response
+        mock_get.side_effect = raw
+
+        files = self.fetcher.fetch_eip_implementation("go-ethereum", 1559, strategy="raw")
+
+        paths = CodeFetcher.CLIENTS["go-ethereum"]["eip_files"][1559]
+        self.assertEqual(list(files), list(paths))
+        self.assertEqual(files, {p: f"// {p.rsplit('/', 1)[-1]}" for p in paths})
+        self.assertTrue(all("raw.githubusercontent.com" in c.args[0]
+                            for c in mock_get.call_args_list))
+
+    @patch('requests.Session.get')
+    def test_strategy_tarball(self, mock_get):
+        """Test that strategy="tarball" reads every file out of one codeload archive"""
+        paths = CodeFetcher.CLIENTS["go-ethereum"]["eip_files"][1559]
+        buf = io.BytesIO()
+        with tarfile.open(fileobj=buf, mode="w:gz") as archive:
+            for path in paths[1:]:
+                body = f"// {path}".encode()
+                info = tarfile.TarInfo(f"go-ethereum-master/{path}")
+                info.size = len(body)
+                archive.addfile(info, io.BytesIO(body))
+        buf.seek(0)
+        archive_response = MagicMock()
+        archive_response.raw = buf
+        archive_response.__enter__.return_value = archive_response
+        mock_get.return_value = archive_response
+
+        files = self.fetcher.fetch_eip_implementation("go-ethereum", 1559, strategy="tarball")
+
+        self.assertEqual(list(files), list(paths))
+        self.assertTrue(files[paths[0]].startswith("# Error fetching file"))
+        self.assertEqual({p: files[p] for p in paths[1:]}, {p: f"// {p}" for p in paths[1:]})
+        mock_get.assert_called_once()
+        self.assertIn("codeload.github.com", mock_get.call_args.args[0])
+
+    @patch('requests.Session.get')
+    def test_strategy_tree(self, mock_get):
+        """Test that strategy="tree" resolves blob SHAs once and fetches blobs"""
+        paths = CodeFetcher.CLIENTS["go-ethereum"]["eip_files"][1559]
+        shas = {p: f"{i:040x}" for i, p in enumerate(paths)}
+
+        def fake_get(url, **kwargs):
+            if "/git/trees/" in url:
+                tree = Mock()
+                tree.json.return_value = {"tree": [{"path": p, "type": "blob", "sha": sha}
+                                                   for p, sha in shas.items()]}
+                return tree
+            return Mock(content=f"// blob {url.rsplit('/', 1)[-1]}".encode())
+        mock_get.side_effect = fake_get
+
+        files = self.fetcher.fetch_eip_implementation("go-ethereum", 1559, strategy="tree")
+
+        self.assertEqual(files, {p: f"// blob {shas[p]}" for p in paths})
+        self.assertEqual(mock_get.call_count, 1 + len(paths))
+
+    @patch('requests.Session.get')
+    @patch('requests.Session.post')
+    def test_strategy_graphql(self, mock_post, mock_get):
+        """Test that strategy="graphql" pulls every file in one authenticated query"""
+        paths = CodeFetcher.CLIENTS["go-ethereum"]["eip_files"][1559]
+        fetcher = CodeFetcher(github_token="tok-a", cache_dir=self.cache_dir)
+        reply = Mock()
+        reply.json.return_value = {"data": {"repository": {
+            f"f{i}": {"text": f"// {p}", "isTruncated": False} for i, p in enumerate(paths)
+        }}}
+        mock_post.return_value = reply
+
+        files = fetcher.fetch_eip_implementation("go-ethereum", 1559, strategy="graphql")
+
+        self.assertEqual(files, {p: f"// {p}" for p in paths})
+        mock_post.assert_called_once()
+        mock_get.assert_not_called()
+
+    def test_unknown_strategy_raises(self):
+        """Test that an unsupported strategy name is rejected"""
+        with self.assertRaises(ValueError):
+            self.fetcher.fetch_eip_implementation("go-ethereum", 1559, strategy="rsync")
+
+    @patch('requests.Session.get')
+    def test_api_calls_rotate_tokens(self, mock_get):
+        """Test that API requests cycle through the token pool"""
+        mock_response = Mock()
+        mock_response.json.return_value = {"items": []}
+        mock_get.return_value = mock_response
+
+        fetcher = CodeFetcher(github_token=["tok-a", "tok-b"],
+                              cache_dir=self.cache_dir)
+        for _ in range(3):
+            fetcher.search_repository("ethereum", "go-ethereum", "CalcBaseFee")
+
+        sent = [c.kwargs["headers"]["Authorization"] for c in mock_get.call_args_list]
+        self.assertEqual(sent, ["token tok-a", "token tok-b", "token tok-a"])
+
+    @patch('src.code_fetcher.time.sleep')
+    @patch('requests.Session.get')
+    def test_search_many_batches_and_backs_off(self, mock_get, mock_sleep):
+        """Test OR-batched search, dedup by sha and Retry-After backoff"""
+        limited = Mock(status_code=403, headers={"Retry-After": "2"})
+        first = Mock(status_code=200, headers={})
+        first.json.return_value = {"items": [{"sha": "1"}, {"sha": "2"}]}
+        second = Mock(status_code=200, headers={})
+        second.json.return_value = {"items": [{"sha": "2"}, {"sha": "3"}]}
+        mock_get.side_effect = [limited, first, second]
+
+        terms = [f"Term{i}" for i in range(8)]
+        items = self.fetcher.search_repository_many("ethereum", "go-ethereum", terms)
+
+        self.assertEqual([i["sha"] for i in items], ["1", "2", "3"])
+        mock_sleep.assert_called_once_with(2.0)
+        queries = [c.kwargs["params"]["q"] for c in mock_get.call_args_list]
+        self.assertEqual(queries[0], queries[1])
+        self.assertTrue(queries[0].startswith("(Term0) OR (Term1)"))
+        self.assertTrue(queries[2].startswith("(Term6) OR (Term7) repo:"))
+        self.assertEqual(mock_get.call_args.kwargs["params"]["per_page"], 100)
+
+    def test_rate_limit_wait_parses_retry_after_forms(self):
+        """Test Retry-After as seconds, as an HTTP-date, and as garbage"""
+        wait = CodeFetcher._rate_limit_wait
+        self.assertEqual(wait(Mock(status_code=429, headers={"Retry-After": "7"}), 60.0), 7.0)
+
+        at = time.strftime("%a, %d %b %Y %H:%M:%S GMT", time.gmtime(time.time() + 30))
+        delay = wait(Mock(status_code=429, headers={"Retry-After": at}), 60.0)
+        self.assertGreater(delay, 25.0)
+        self.assertLessEqual(delay, 30.0)
+
+        past = "Wed, 21 Oct 2015 07:28:00 GMT"
+        self.assertEqual(wait(Mock(status_code=429, headers={"Retry-After": past}), 60.0), 0.0)
+        self.assertEqual(wait(Mock(status_code=429, headers={"Retry-After": "soon"}), 60.0), 60.0)
+
+    @patch('requests.Session.get')
+    def test_raw_fetch_is_anonymous(self, mock_get):
+        """Test that raw file downloads don't carry the API token"""
+        mock_response = Mock()
+        mock_response.content = b"package main"
+        mock_response.iter_content.return_value = [mock_response.content]
+        mock_response.status_code = 200
+        mock_response.headers = {}
+        mock_get.return_value = mock_response
+
+        fetcher = CodeFetcher(github_token="tok-a", cache_dir=self.cache_dir)
+        fetcher.fetch_file("ethereum", "go-ethereum", "main.go", use_cache=False)
+
+        self.assertNotIn("Authorization", mock_get.call_args.kwargs["headers"])
+        self.assertNotIn("Authorization", fetcher.session.headers)
+
+    def test_fetchers_share_connection_pool(self):
+        """Test that CodeFetchers reuse one keep-alive pool"""
+        other = CodeFetcher(cache_dir=self.cache_dir)
+        url = "https://raw.githubusercontent.com/"
+        self.assertIs(other.session.get_adapter(url), self.fetcher.session.get_adapter(url))
+
+    @patch('requests.Session.get')
+    def test_exhausted_retries_fail_one_file_only(self, mock_get):
+        """Test that a 5xx that outlasts the retries is reported per file"""
+        paths = CodeFetcher.CLIENTS["go-ethereum"]["eip_files"][1559]
+
+        def get(url, **kwargs):
+            if url.endswith(paths[0]):
+                unavailable = requests.Response()
+                unavailable.status_code = 503
+                unavailable.url = url
+                unavailable.raw = io.BytesIO(b"")
+                return unavailable
+            if url.endswith(paths[1]):
+                raise requests.exceptions.RetryError("too many 503 error responses")
+            ok = Mock(status_code=200, headers={})
+            ok.iter_content.return_value = [b"package misc"]
+            return ok
+        mock_get.side_effect = get
+
+        files = self.fetcher.fetch_eip_implementation("go-ethereum", 1559)
+
+        self.assertIn("503", files[paths[0]])
+        self.assertTrue(files[paths[1]].startswith("# Error fetching file"))
+        self.assertTrue(all(files[p] == "package misc" for p in paths[2:]))
+        adapter = self.fetcher.session.get_adapter("https://raw.githubusercontent.com/")
+        self.assertFalse(adapter.max_retries.raise_on_status)
+
+    @patch('src.code_fetcher.GIT_AVAILABLE', True)
+    def test_clone_modes_pass_git_options(self):
+        """Test that each clone mode hands its own options to git clone"""
+        expected = {
+            "full": [],
+            "shallow": ["--depth=1", "--single-branch", "--no-tags"],
+            "treeless": ["--depth=1", "--filter=tree:0", "--single-branch", "--no-tags"],
+            "blobless": ["--depth=1", "--filter=blob:none", "--single-branch", "--no-tags"],
+        }
+        url = "https://github.com/ethereum/go-ethereum"
+        with patch('src.code_fetcher.Repo', create=True) as repo:
+            for mode, options in expected.items():
+                target = self.fetcher.clone_repository(url, self.cache_dir, mode=mode)
+                self.assertEqual(target, self.cache_dir)
+                repo.clone_from.assert_called_with(url, self.cache_dir, branch="master",
+                                                   multi_options=options)
+            self.fetcher.clone_repository(url, self.cache_dir, shallow=False)
+            self.assertEqual(repo.clone_from.call_args.kwargs["multi_options"], [])
+
+            with self.assertRaises(ValueError):
+                self.fetcher.clone_repository(url, self.cache_dir, mode="sparse")
+            self.assertEqual(repo.clone_from.call_count, len(expected) + 1)
+
     def test_client_info(self):
         """Test that client info is available"""
         self.assertIn("go-ethereum", self.fetcher.CLIENTS)
@@ -197,6 +1145,28 @@ func CalcBaseFee(config *ChainConfig, parent *Header) *big.Int {
         self.assertEqual(blocks[0].type, "function")
         self.assertEqual(blocks[0].language, "go")
 
+    def test_parse_go_nested_braces(self):
+        """Test that Go bodies close on the matching brace, not the first one"""
+        go_code = """package eip1559
+
+func CalcBaseFee(parent *Header) *big.Int {
+\tcache := map[string]int{}
+\tif parent == nil {
+\t\treturn nil
+\t}
+\treturn big.NewInt(int64(len(cache)))
+}
+
+func (h *Header) Hash() common.Hash { return rlpHash(h) }
+"""
+        blocks = self.parser.parse_file(go_code, "go")
+
+        self.assertEqual([b.name for b in blocks], ["CalcBaseFee", "Hash"])
+        self.assertEqual((blocks[0].start_line, blocks[0].end_line), (3, 9))
+        self.assertTrue(blocks[0].content.endswith("len(cache)))\n}"))
+        self.assertEqual(blocks[1].type, "method")
+        self.assertEqual((blocks[1].start_line, blocks[1].end_line), (11, 11))
+
     def test_parse_python_function(self):
         """Test parsing Python functions"""
         python_code = '''
@@ -211,6 +1181,163 @@ def calculate_base_fee(parent_gas_used: int, parent_gas_limit: int) -> int:
         self.assertGreater(len(blocks), 0)
         self.assertEqual(blocks[0].name, "calculate_base_fee")
 
+    def test_parse_python_classes_and_methods(self):
+        """Test that ast parsing sees methods, multi-line signatures and docstrings"""
+        python_code = '''
+class FeeMarket:
+    """Tracks the base fee."""
+
+    def next_base_fee(self, gas_used: int,
+                      gas_target: int) -> int:
+        """Return the next block's base fee."""
+        text = "def not_a_function(): pass"
+        return gas_used - gas_target
+'''
+        blocks = self.parser.parse_file(python_code, "python")
+
+        self.assertEqual([(b.name, b.type) for b in blocks],
+                         [("FeeMarket", "class"), ("next_base_fee", "method")])
+        self.assertEqual(blocks[1].start_line, 5)
+        self.assertEqual(blocks[1].end_line, 9)
+        self.assertEqual(blocks[1].docstring, "Return the next block's base fee.")
+
+    def test_parse_python_fallback_for_invalid_source(self):
+        """Test the line-based fallback on source the ast module rejects"""
+        python_code = (
+            "def calc_base_fee(parent):\n"
+            "    return parent.base_fee +\n"
+            "\n"
+            "def calc_blob_fee(excess):\n"
+            "    return excess\n"
+            "class Trailing:"
+        )
+        blocks = self.parser.parse_file(python_code, "python")
+
+        self.assertEqual([b.name for b in blocks],
+                         ["calc_base_fee", "calc_blob_fee", "Trailing"])
+        self.assertEqual((blocks[0].start_line, blocks[0].end_line), (1, 3))
+        self.assertEqual((blocks[1].start_line, blocks[1].end_line), (4, 5))
+
+    def test_tree_sitter_query_parsing(self):
+        """Test the tree-sitter query path on functions and methods"""
+        parser = CodeParser()
+        if not parser.use_tree_sitter:
+            self.skipTest("tree-sitter grammars not installed")
+        go_code = """package core
+
+func (p *Pool) Add(tx *Tx) error {
+    return nil
+}
+
+func CalcBaseFee(parent *Header) *big.Int {
+    return nil
+}
+"""
+        blocks = parser.parse_file(go_code, "go")
+
+        self.assertEqual([(b.name, b.type) for b in blocks],
+                         [("Add", "method"), ("CalcBaseFee", "function")])
+        self.assertEqual((blocks[1].start_line, blocks[1].end_line), (7, 9))
+
+    def test_tree_sitter_non_ascii_spans(self):
+        """Test that byte offsets line up with non-ASCII source text"""
+        parser = CodeParser()
+        if not parser.use_tree_sitter:
+            self.skipTest("tree-sitter grammars not installed")
+        code = '# prélude — ünïcode\ndef grundgebühr():\n    return "ß"\n'
+
+        blocks = parser.parse_file(code, "python")
+
+        self.assertEqual(blocks[0].name, "grundgebühr")
+        self.assertEqual(blocks[0].content, 'def grundgebühr():\n    return "ß"')
+
+    def test_tree_sitter_grammars_shared(self):
+        """Test that parsers share compiled queries but not Parser objects"""
+        first, second = CodeParser(), CodeParser()
+        if not first.use_tree_sitter:
+            self.skipTest("tree-sitter grammars not installed")
+        self.assertIs(first._ts_queries["go"], second._ts_queries["go"])
+        self.assertIsNot(first._ts_parsers["go"], second._ts_parsers["go"])
+
+    def test_parse_cache_skips_reparse(self):
+        """Test that unchanged content is served from the SQLite parse cache"""
+        cache_dir = tempfile.mkdtemp(prefix="prspec_ast_")
+        self.addCleanup(shutil.rmtree, cache_dir, ignore_errors=True)
+        code = "package core\n\n" + "".join(
+            f"func CalcBaseFee{i}() int {{\n    return {i}\n}}\n\n" for i in range(20)
+        )
+
+        parser = CodeParser(use_tree_sitter=False, cache_dir=cache_dir)
+        first = parser.parse_file(code, "go", filename="core/fee.go")
+
+        reopened = CodeParser(use_tree_sitter=False, cache_dir=cache_dir)
+        with patch.object(reopened, "_parse") as mock_parse:
+            second = reopened.parse_file(code, "go", filename="core/fee.go")
+        mock_parse.assert_not_called()
+        self.assertEqual(second, first)
+
+    def test_parse_cache_separates_backends(self):
+        """Test that regex-parsed rows are not served to a tree-sitter parser"""
+        cache_dir = tempfile.mkdtemp(prefix="prspec_ast_")
+        self.addCleanup(shutil.rmtree, cache_dir, ignore_errors=True)
+        code = "package core\n\n" + "".join(
+            f"func CalcBaseFee{i}() int {{\n    return {i}\n}}\n\n" for i in range(20)
+        )
+        CodeParser(use_tree_sitter=False, cache_dir=cache_dir).parse_file(code, "go", filename="fee.go")
+
+        ts_parser = CodeParser(cache_dir=cache_dir)
+        if not ts_parser.use_tree_sitter:
+            self.skipTest("tree-sitter grammars not installed")
+        with patch.object(ts_parser, "_parse", return_value=[]) as mock_parse:
+            ts_parser.parse_file(code, "go", filename="fee.go")
+        mock_parse.assert_called_once()
+
+    @patch('src.parser.ORJSON_AVAILABLE', False)
+    def test_parse_cache_rows_are_json_without_orjson(self):
+        """Test that the stdlib fallback stores plain JSON rows, never pickles"""
+        cache_dir = tempfile.mkdtemp(prefix="prspec_ast_")
+        self.addCleanup(shutil.rmtree, cache_dir, ignore_errors=True)
+        code = "package core\n\n" + "".join(
+            f"func CalcBaseFee{i}() int {{\n    return {i}\n}}\n\n" for i in range(20)
+        )
+        parser = CodeParser(use_tree_sitter=False, cache_dir=cache_dir)
+        first = parser.parse_file(code, "go", filename="core/fee.go")
+
+        (row,) = parser._cache.execute("SELECT blocks FROM ast").fetchone()
+        self.assertTrue(row.startswith(b'[["CalcBaseFee0","function",'))
+        reopened = CodeParser(use_tree_sitter=False, cache_dir=cache_dir)
+        with patch.object(reopened, "_parse") as mock_parse:
+            self.assertEqual(reopened.parse_file(code, "go", filename="core/fee.go"), first)
+        mock_parse.assert_not_called()
+
+    def test_parse_cache_reparses_unreadable_rows(self):
+        """Test that unreadable or mis-shaped rows are treated as misses"""
+        cache_dir = tempfile.mkdtemp(prefix="prspec_ast_")
+        self.addCleanup(shutil.rmtree, cache_dir, ignore_errors=True)
+        code = "package core\n\n" + "".join(
+            f"func CalcBaseFee{i}() int {{\n    return {i}\n}}\n\n" for i in range(20)
+        )
+        parser = CodeParser(use_tree_sitter=False, cache_dir=cache_dir)
+        expected = parser.parse_file(code, "go", filename="core/fee.go")
+
+        for stale in (b"\x80\x04not json", b'[["CalcBaseFee", "function"]]', b'{"a": 1}'):
+            parser._cache.execute("UPDATE ast SET blocks = ?", (stale,))
+            parser._cache.commit()
+            reopened = CodeParser(use_tree_sitter=False, cache_dir=cache_dir)
+            self.assertEqual(reopened.parse_file(code, "go", filename="core/fee.go"), expected)
+
+    def test_parse_cache_bypassed_for_snippets(self):
+        """Test that short snippets are parsed directly without touching SQLite"""
+        cache_dir = tempfile.mkdtemp(prefix="prspec_ast_")
+        self.addCleanup(shutil.rmtree, cache_dir, ignore_errors=True)
+        parser = CodeParser(use_tree_sitter=False, cache_dir=cache_dir)
+
+        blocks = parser.parse_file("func CalcBaseFee() int {\n    return 0\n}\n", "go")
+
+        self.assertEqual([b.name for b in blocks], ["CalcBaseFee"])
+        rows = parser._cache.execute("SELECT COUNT(*) FROM ast").fetchone()[0]
+        self.assertEqual(rows, 0)
+
     def test_find_eip1559_functions(self):
         """Test finding EIP-1559 related functions"""
         code = """
@@ -232,6 +1359,101 @@ func ValidateGasLimit(header *Header) bool {
         names = [b.name for b in blocks]
         self.assertIn("CalcBaseFee", names)
 
+    def test_iter_eip_functions_is_lazy(self):
+        """Test that iter_eip_functions yields find_eip_functions' blocks on demand"""
+        code = "".join(f"func CalcBaseFee{i}() int {{\n    return {i}\n}}\n\n" for i in range(3))
+        lazy = self.parser.iter_eip_functions(code, "go", 1559)
+
+        self.assertEqual(next(lazy).name, "CalcBaseFee0")
+        self.assertEqual(
+            [b.name for b in self.parser.iter_eip_functions(code, "go", 1559)],
+            [b.name for b in self.parser.find_eip_functions(code, "go", 1559)],
+        )
+
+    def test_find_eips_skips_parse_without_keywords(self):
+        """Test that a file mentioning no keyword is rejected before parsing"""
+        code = "func DoSomethingElse() {\n    return\n}\n"
+        with patch.object(self.parser, "parse_file") as parse:
+            found = self.parser.find_eips(code, "go", [1559, 4844])
+        parse.assert_not_called()
+        self.assertEqual(found, {1559: [], 4844: []})
+
+    def test_find_eip_functions_ignores_case(self):
+        """Test that keyword matching is case-insensitive without lowercasing"""
+        code = """
+func CalcBASEFEE(parent *Header) *big.Int {
+    return nil
+}
+
+func DoSomethingElse() {
+}
+"""
+        blocks = self.parser.find_eip1559_functions(code, "go")
+
+        self.assertEqual([b.name for b in blocks], ["CalcBASEFEE"])
+
+    def test_find_eips_routes_blocks_in_one_pass(self):
+        """Test bucketing blocks for several EIPs from a single parse"""
+        code = """
+func CalcBaseFee(parent *Header) *big.Int {
+    return nil
+}
+
+func CalcBlobFee(excessBlobGas uint64) *big.Int {
+    return nil
+}
+
+func SetBlobBaseFee(blob_base_fee uint64) {
+}
+
+func DoSomethingElse() {
+}
+"""
+        found = self.parser.find_eips(code, "go", [1559, 4844])
+
+        self.assertEqual([b.name for b in found[1559]], ["CalcBaseFee", "SetBlobBaseFee"])
+        self.assertEqual([b.name for b in found[4844]], ["CalcBlobFee", "SetBlobBaseFee"])
+        self.assertEqual(found[1559], self.parser.find_eip_functions(code, "go", 1559))
+
+    def test_scan_repo_reports_eips_per_file(self):
+        """Test the whole-file keyword pre-filter across several EIPs"""
+        tmp = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, tmp)
+        (tmp / "fee.go").write_text("func CalcBaseFee() { excessBlobGas := 0 }")
+        (tmp / "beacon.go").write_text("// PARENT_BEACON_BLOCK_ROOT handling")
+        (tmp / "empty.go").write_text("")
+
+        found = self.parser.scan_repo(sorted(tmp.iterdir()))
+
+        self.assertEqual(found[tmp / "fee.go"], {1559, 4844})
+        self.assertEqual(found[tmp / "beacon.go"], {4788})
+        self.assertEqual(found[tmp / "empty.go"], set())
+        self.assertEqual(
+            self.parser.scan_repo([tmp / "fee.go"], [4844]), {tmp / "fee.go": {4844}}
+        )
+
+    @unittest.skipIf(not HYPERSCAN_AVAILABLE, "hyperscan not installed")
+    def test_find_eips_hyperscan_matches_regex_router(self):
+        """Test that the Hyperscan scan routes blocks like the regex router"""
+        code = """
+func CalcBaseFee(parent *types.Header) *big.Int {
+    return parent.BaseFee
+}
+
+func CalcBlobFee(excessBlobGas uint64) *big.Int {
+    return fakeExponential(minBlobGasprice, excessBlobGas)
+}
+
+func Unrelated() {
+}
+"""
+        eips = [1559, 4844, 4788]
+        fast = self.parser.find_eips(code, "go", eips)
+        with patch("src.parser.HYPERSCAN_AVAILABLE", False):
+            slow = self.parser.find_eips(code, "go", eips)
+        for eip in eips:
+            self.assertEqual([b.name for b in fast[eip]], [b.name for b in slow[eip]])
+
     def test_extract_go_comments(self):
         """Test extracting Go comments"""
         code = """
@@ -246,6 +1468,37 @@ func Test() {
         single_comments = [c for c in comments if c["type"] == "single"]
         self.assertGreater(len(single_comments), 0)
 
+    def test_extract_comments_skips_string_literals(self):
+        """Test that comment markers inside strings aren't reported"""
+        code = """
+/* header
+   block */
+func URL() string {
+    s := "https://example.org /* not a comment */"
+    return s // trailing
+}
+"""
+        comments = self.parser.extract_comments(code, "go")
+
+        self.assertEqual(
+            [(c["line"], c["type"], c["content"]) for c in comments],
+            [(2, "multi", "header\n   block"), (6, "single", "trailing")],
+        )
+
+    def test_extract_comments_backslash_continued_string(self):
+        """Test that a Python string continued with a backslash stays a string"""
+        code = (
+            'url = "https://example.org/\\\n'
+            '# still inside the string"\n'
+            "label = 'a \\\n# also inside' # real comment\n"
+        )
+        comments = self.parser.extract_comments(code, "python")
+
+        self.assertEqual(
+            [(c["line"], c["type"], c["content"]) for c in comments],
+            [(4, "single", "real comment")],
+        )
+
 
 class TestCodeBlock(unittest.TestCase):
     """Tests for CodeBlock dataclass"""
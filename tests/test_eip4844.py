@@ -1,7 +1,9 @@
 """Tests for EIP-4844 (blob transactions) support."""
 
 import os
+import shutil
 import sys
+import tempfile
 import unittest
 from pathlib import Path
 from unittest.mock import Mock, patch
@@ -97,10 +99,14 @@ class TestSpecFetcherEIP4844(unittest.TestCase):
         """fetch_eip_spec(4844) should return a dict with eip_markdown."""
         mock_resp = Mock()
         mock_resp.text = "# EIP-4844\n\n## Abstract\nBlob txs\n## Specification\nDetails"
+        mock_resp.content = mock_resp.text.encode()
+        mock_resp.iter_content.return_value = [mock_resp.content]
+        mock_resp.status_code = 200
+        mock_resp.headers = {}
         mock_resp.raise_for_status = Mock()
         mock_get.return_value = mock_resp
 
-        fetcher = SpecFetcher(cache_dir="/tmp/prspec_test_4844_cache")
+        fetcher = SpecFetcher(cache_dir=":memory:")
         try:
             result = fetcher.fetch_eip_spec(4844)
             self.assertIn("eip_markdown", result)
@@ -113,10 +119,14 @@ class TestSpecFetcherEIP4844(unittest.TestCase):
         """fetch_eip4844_spec() should delegate to fetch_eip_spec."""
         mock_resp = Mock()
         mock_resp.text = "# EIP-4844\nblob stuff"
+        mock_resp.content = mock_resp.text.encode()
+        mock_resp.iter_content.return_value = [mock_resp.content]
+        mock_resp.status_code = 200
+        mock_resp.headers = {}
         mock_resp.raise_for_status = Mock()
         mock_get.return_value = mock_resp
 
-        fetcher = SpecFetcher(cache_dir="/tmp/prspec_test_4844_cache2")
+        fetcher = SpecFetcher(cache_dir=":memory:")
         try:
             result = fetcher.fetch_eip4844_spec()
             self.assertIsInstance(result, dict)
@@ -125,12 +135,16 @@ class TestSpecFetcherEIP4844(unittest.TestCase):
 
     def test_unregistered_eip_falls_back(self):
         """Requesting an unregistered EIP should still try to fetch the markdown."""
-        fetcher = SpecFetcher()
+        fetcher = SpecFetcher(cache_dir=":memory:")
         # It won't raise; it falls back to fetching the EIP markdown.
         # We just check it doesn't crash and returns a dict with eip_markdown key.
         with patch("requests.Session.get") as mock_get:
             mock_resp = Mock()
             mock_resp.text = "# EIP-99999 - Hypothetical"
+            mock_resp.content = mock_resp.text.encode()
+            mock_resp.iter_content.return_value = [mock_resp.content]
+            mock_resp.status_code = 200
+            mock_resp.headers = {}
             mock_resp.raise_for_status = Mock()
             mock_get.return_value = mock_resp
             result = fetcher.fetch_eip_spec(99999)
@@ -140,6 +154,11 @@ class TestSpecFetcherEIP4844(unittest.TestCase):
 class TestCodeFetcherEIP4844(unittest.TestCase):
     """Tests for CodeFetcher EIP-4844 support."""
 
+    def setUp(self):
+        # Per-test cache dir, so parallel test workers never share one
+        self.cache_dir = tempfile.mkdtemp(prefix="prspec_test_4844_")
+        self.addCleanup(shutil.rmtree, self.cache_dir, ignore_errors=True)
+
     def test_geth_supports_4844(self):
         """go-ethereum should list 4844 as a supported EIP."""
         self.assertIn(4844, CodeFetcher.supported_eips_for_client("go-ethereum"))
@@ -157,10 +176,14 @@ class TestCodeFetcherEIP4844(unittest.TestCase):
         """fetch_eip_implementation('go-ethereum', 4844) should return dict of file contents."""
         mock_resp = Mock()
         mock_resp.text = "package types\n\ntype BlobTx struct{}"
+        mock_resp.content = mock_resp.text.encode()
+        mock_resp.iter_content.return_value = [mock_resp.content]
+        mock_resp.status_code = 200
+        mock_resp.headers = {}
         mock_resp.raise_for_status = Mock()
         mock_get.return_value = mock_resp
 
-        fetcher = CodeFetcher(cache_dir="/tmp/prspec_test_code_4844")
+        fetcher = CodeFetcher(cache_dir=self.cache_dir)
         try:
             files = fetcher.fetch_eip_implementation("go-ethereum", 4844)
             self.assertIsInstance(files, dict)
@@ -173,10 +196,14 @@ class TestCodeFetcherEIP4844(unittest.TestCase):
         """fetch_eip4844_implementation() delegates correctly."""
         mock_resp = Mock()
         mock_resp.text = "package types"
+        mock_resp.content = mock_resp.text.encode()
+        mock_resp.iter_content.return_value = [mock_resp.content]
+        mock_resp.status_code = 200
+        mock_resp.headers = {}
         mock_resp.raise_for_status = Mock()
         mock_get.return_value = mock_resp
 
-        fetcher = CodeFetcher(cache_dir="/tmp/prspec_test_code_4844_b")
+        fetcher = CodeFetcher(cache_dir=self.cache_dir)
         try:
             files = fetcher.fetch_eip4844_implementation("go-ethereum")
             self.assertIsInstance(files, dict)
@@ -185,7 +212,7 @@ class TestCodeFetcherEIP4844(unittest.TestCase):
 
     def test_unsupported_client_raises(self):
         """Requesting files for a non-existent client should raise ValueError."""
-        fetcher = CodeFetcher()
+        fetcher = CodeFetcher(cache_dir=self.cache_dir)
         with self.assertRaises(ValueError):
             fetcher.fetch_eip_implementation("nonexistent-client", 4844)
 
@@ -289,6 +316,26 @@ class TestConfigEIP4844(unittest.TestCase):
         self.assertIsInstance(areas, list)
 
 
+    def test_config_json_used_only_when_newer_and_discovered(self):
+        """A sibling config.json shadows config.yaml only when discovered and not stale."""
+        tmp = tempfile.mkdtemp(prefix="prspec_cfg_")
+        self.addCleanup(shutil.rmtree, tmp, ignore_errors=True)
+        yaml_path = Path(tmp) / "config.yaml"
+        json_path = Path(tmp) / "config.json"
+        yaml_path.write_text("analysis:\n  max_concurrency: 2\n")
+        json_path.write_text('{"analysis": {"max_concurrency": 7}}')
+
+        with patch("src.config._find_config_file", return_value=str(yaml_path)):
+            os.utime(json_path, (1000, 1000))
+            self.assertEqual(Config().max_concurrency, 2)  # stale JSON ignored
+            os.utime(json_path, None)
+            os.utime(yaml_path, (1000, 1000))
+            self.assertEqual(Config().max_concurrency, 7)
+
+        # An explicit path is always read as given
+        self.assertEqual(Config(str(yaml_path)).max_concurrency, 2)
+
+
 class TestEIP4844Integration(unittest.TestCase):
     """Integration test for the full EIP-4844 pipeline (requires API key)."""
 
@@ -1,11 +1,13 @@
 """Tests for the PRSpec Engine API."""
 
+import json
 import os
 import sys
 import tempfile
 import textwrap
 import unittest
 from pathlib import Path
+from unittest.mock import patch
 
 # Ensure project root is on the path
 sys.path.insert(0, str(Path(__file__).parent.parent))
@@ -112,6 +114,18 @@ class TestScanPathBasic(unittest.TestCase):
             f"Expected EIP-1559 finding; got titles: {eip_ids}",
         )
 
+    def test_findings_pinned(self):
+        result = scan_path(self.tmpdir)
+        self.assertEqual(
+            [(f["file"], f["line"], f["message"]) for f in result["findings"]],
+            [
+                ("eip1559.go", 6, "Function 'CalcBaseFee' matches EIP-1559 keywords: "
+                                  "basefee, calcbasefee, gaslimit"),
+                ("eip1559.go", 13, "Function 'VerifyEip1559Header' matches EIP-1559 keywords: "
+                                   "1559, basefee, verifyeip1559"),
+            ],
+        )
+
     # ---- Edge cases ----
 
     def test_nonexistent_path_raises(self):
@@ -141,6 +155,12 @@ class TestScanPathBasic(unittest.TestCase):
         self.assertIn("_json", result)
         self.assertIsInstance(result["_json"], str)
 
+    def test_json_pretty_output_big_int(self):
+        # orjson can't encode integers beyond 64 bits; stdlib json can
+        with patch("src.engine.api._prspec_version", 2 ** 64):
+            result = scan_path(self.tmpdir, output="json-pretty")
+        self.assertEqual(json.loads(result["_json"])["tool_version"], 2 ** 64)
+
 
 class TestScanPathMultiEIP(unittest.TestCase):
     """Verify that multiple EIP keyword sets are checked."""
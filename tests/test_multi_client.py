@@ -1,6 +1,10 @@
 """Tests for multi-client support (Nethermind, Besu) — Phase 2."""
 
+import shutil
 import sys
+import tempfile
+import threading
+import time
 import unittest
 from pathlib import Path
 from unittest.mock import Mock, patch
@@ -251,7 +255,9 @@ class TestCodeFetcherMultiClient(unittest.TestCase):
     """Verify CodeFetcher.fetch_eip_files works for new clients via mocked HTTP."""
 
     def setUp(self):
-        self.fetcher = CodeFetcher(cache_dir="/tmp/prspec_test_mc")
+        self.cache_dir = tempfile.mkdtemp(prefix="prspec_test_mc_")
+        self.addCleanup(shutil.rmtree, self.cache_dir, ignore_errors=True)
+        self.fetcher = CodeFetcher(cache_dir=self.cache_dir)
 
     def tearDown(self):
         self.fetcher.clear_cache()
@@ -260,6 +266,10 @@ class TestCodeFetcherMultiClient(unittest.TestCase):
     def test_fetch_nethermind_eip1559(self, mock_get):
         mock_resp = Mock()
         mock_resp.text = "public class BaseFeeCalculator { }"
+        mock_resp.content = mock_resp.text.encode()
+        mock_resp.iter_content.return_value = [mock_resp.content]
+        mock_resp.status_code = 200
+        mock_resp.headers = {}
         mock_resp.raise_for_status = Mock()
         mock_get.return_value = mock_resp
 
@@ -271,6 +281,10 @@ class TestCodeFetcherMultiClient(unittest.TestCase):
     def test_fetch_besu_eip4844(self, mock_get):
         mock_resp = Mock()
         mock_resp.text = "public class CancunGasCalculator { }"
+        mock_resp.content = mock_resp.text.encode()
+        mock_resp.iter_content.return_value = [mock_resp.content]
+        mock_resp.status_code = 200
+        mock_resp.headers = {}
         mock_resp.raise_for_status = Mock()
         mock_get.return_value = mock_resp
 
@@ -278,6 +292,68 @@ class TestCodeFetcherMultiClient(unittest.TestCase):
         self.assertEqual(len(files), 5)
         self.assertTrue(mock_get.called)
 
+    @patch("requests.Session.get")
+    def test_fetch_many_pairs(self, mock_get):
+        mock_resp = Mock()
+        mock_resp.content = b"// client source"
+        mock_resp.iter_content.return_value = [mock_resp.content]
+        mock_resp.status_code = 200
+        mock_resp.headers = {}
+        mock_get.return_value = mock_resp
+
+        pairs = [("nethermind", 1559), ("besu", 4844), ("nethermind", 4844)]
+        results = self.fetcher.fetch_eip_implementations(pairs)
+
+        self.assertEqual(list(results), pairs)
+        expected = {
+            (c, e): len(CodeFetcher.CLIENTS[c]["eip_files"][e]) for c, e in pairs
+        }
+        self.assertEqual({pair: len(files) for pair, files in results.items()}, expected)
+        self.assertLessEqual(mock_get.call_count, sum(expected.values()))
+
+    @patch("requests.Session.get")
+    def test_max_workers_caps_parallel_downloads(self, mock_get):
+        active, peak = [0], [0]
+        lock = threading.Lock()
+
+        def slow_get(*args, **kwargs):
+            with lock:
+                active[0] += 1
+                peak[0] = max(peak[0], active[0])
+            time.sleep(0.02)
+            with lock:
+                active[0] -= 1
+            resp = Mock()
+            resp.content = b"// client source"
+            resp.iter_content.return_value = [resp.content]
+            resp.status_code = 200
+            resp.headers = {}
+            return resp
+
+        mock_get.side_effect = slow_get
+        fetcher = CodeFetcher(cache_dir=self.cache_dir, max_workers=2)
+        files = fetcher.fetch_eip_implementation("nethermind", 1559)
+
+        self.assertEqual(len(files), 5)
+        self.assertLessEqual(peak[0], 2)
+
+    @patch("requests.Session.get")
+    def test_cached_files_skip_network(self, mock_get):
+        mock_resp = Mock()
+        mock_resp.content = b"public class BaseFeeCalculator { }"
+        mock_resp.iter_content.return_value = [mock_resp.content]
+        mock_resp.status_code = 200
+        mock_resp.headers = {}
+        mock_get.return_value = mock_resp
+
+        first = self.fetcher.fetch_eip_implementation("nethermind", 1559)
+        mock_get.reset_mock()
+        second = self.fetcher.fetch_eip_implementation("nethermind", 1559)
+
+        self.assertFalse(mock_get.called)
+        self.assertEqual(list(second), list(first))
+        self.assertEqual(second, first)
+
 
 if __name__ == "__main__":
     unittest.main(verbosity=2)